@@ -0,0 +1,200 @@
+"""
+Monte Carlo analytics of simulated players, every player walks the
+graph picking weighted random moves until FAILURE, WIN or maxSteps
+
+    python analytics.py --players 1000000 --aversion 0.5 --undo 0.2
+"""
+
+import argparse
+import json
+import numpy as np
+from stategraph import StateGraph
+
+
+class PlayerModel:
+    """
+    how simulated players pick moves, every possible move gets a weight:
+    moveWeights by move name (default 1), multiplied by aversion when the
+    move loses at once and by undo when it goes back to the previous state.
+    aversion=0 models players who never make a losing move, undo=0 ones
+    who never undo
+    """
+
+    def __init__(self, moveWeights=None, aversion=1.0, undo=1.0):
+        self.moveWeights = moveWeights or {}
+        self.aversion = aversion
+        self.undo = undo
+
+    def weights(self, graph):
+        """(states, moves) base weights, 0 where a move isn't possible"""
+        base = np.array([self.moveWeights.get(n, 1.0) for n in graph.moveNames])
+        possible = graph.table >= 0
+        weights = np.where(possible, base, 0.0)
+        loses = possible & graph.failure[np.where(possible, graph.table, 0)]
+        weights[loses] *= self.aversion
+        return weights
+
+
+def wilson(successes, trials, z=1.96):
+    """95% wilson score interval of a proportion"""
+    if trials == 0:
+        return 0.0, 1.0
+    p = successes / trials
+    center = (p + z * z / (2 * trials)) / (1 + z * z / trials)
+    half = (
+        z
+        * np.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials))
+        / (1 + z * z / trials)
+    )
+    return float(center - half), float(center + half)
+
+
+def play(graph, model, players, maxSteps=200, rng=None):
+    """
+    walks players from start at once, returns (outcome steps, final states,
+    visits per state, losing moves made per state), steps is -1 for
+    players that hit maxSteps and 0 when start is already FAILURE or WIN
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    weights = model.weights(graph)
+    states = np.full(players, graph.start, dtype=graph.table.dtype)
+    previous = np.full(players, -1, dtype=graph.table.dtype)
+    steps = np.full(players, -1, dtype=np.int32)
+    visits = np.zeros(graph.size, dtype=np.int64)
+    losses = np.zeros(graph.size, dtype=np.int64)
+
+    ended = graph.terminal[states]
+    steps[ended] = 0
+    live = np.flatnonzero(~ended)
+    for step in range(maxSteps):
+        if live.size == 0:
+            break
+        current = states[live]
+        visits += np.bincount(current, minlength=graph.size)
+        w = weights[current]
+        if model.undo != 1:
+            w = np.where(
+                graph.table[current] == previous[live, None], w * model.undo, w
+            )
+        total = w.cumsum(axis=1)
+        # players with no weighted move left pick any possible one
+        stuck = total[:, -1] <= 0
+        if stuck.any():
+            w[stuck] = graph.table[current[stuck]] >= 0
+            total[stuck] = w[stuck].cumsum(axis=1)
+        pick = (total < rng.random(live.size)[:, None] * total[:, -1:]).sum(axis=1)
+        target = graph.table[current, pick]
+        previous[live] = current
+        states[live] = target
+
+        ended = graph.terminal[target]
+        losses += np.bincount(current[graph.failure[target]], minlength=graph.size)
+        steps[live[ended]] = step + 1
+        live = live[~ended]
+    return steps, states, visits, losses
+
+
+def analyze(graph, model, players, maxSteps=200, batch=200000, seed=None, top=5):
+    """runs players in batches and summarizes outcomes into a dict"""
+    rng = np.random.default_rng(seed)
+    wins = failures = 0
+    stepCounts = np.zeros(maxSteps + 1, dtype=np.int64)
+    visits = np.zeros(graph.size, dtype=np.int64)
+    losses = np.zeros(graph.size, dtype=np.int64)
+    for first in range(0, players, batch):
+        count = min(batch, players - first)
+        steps, states, v, l = play(graph, model, count, maxSteps, rng)
+        done = steps >= 0
+        wins += int((states[done] == graph.win).sum())
+        failures += int(graph.failure[states[done]].sum())
+        stepCounts += np.bincount(steps[done], minlength=maxSteps + 1)
+        visits += v
+        losses += l
+    timeouts = players - wins - failures
+
+    finished = stepCounts.sum()
+    cumulative = stepCounts.cumsum()
+
+    def percentile(q):
+        return int(np.searchsorted(cumulative, q * finished)) if finished else None
+
+    # states where players most often make a losing move
+    rate = np.divide(losses, visits, out=np.zeros(graph.size), where=visits > 0)
+    order = np.lexsort((-losses, -rate))
+    dangerous = [
+        {
+            "state": graph.name(int(s)),
+            "visits": int(visits[s]),
+            "losingMoves": int(losses[s]),
+            "lossRate": float(rate[s]),
+        }
+        for s in order[:top]
+        if losses[s] > 0
+    ]
+    return {
+        "players": players,
+        "win": {"p": wins / players, "ci95": wilson(wins, players)},
+        "failure": {"p": failures / players, "ci95": wilson(failures, players)},
+        "timeout": {"p": timeouts / players, "maxSteps": maxSteps},
+        "steps": {
+            "mean": (
+                float((np.arange(maxSteps + 1) * stepCounts).sum() / finished)
+                if finished
+                else None
+            ),
+            "p50": percentile(0.5),
+            "p90": percentile(0.9),
+            "p99": percentile(0.99),
+            "histogram": (
+                stepCounts[: np.flatnonzero(stepCounts)[-1] + 1].tolist()
+                if finished
+                else []
+            ),
+        },
+        "dangerous": dangerous,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--players", type=int, default=1000000)
+    parser.add_argument("--missionaries", type=int, default=3)
+    parser.add_argument("--cannibals", type=int, default=3)
+    parser.add_argument("--capacity", type=int, default=2)
+    parser.add_argument("--aversion", type=float, default=1.0)
+    parser.add_argument("--undo", type=float, default=1.0)
+    parser.add_argument(
+        "--weight", nargs=2, action="append", default=[], metavar=("MOVE", "WEIGHT")
+    )
+    parser.add_argument("--max-steps", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+    graph = StateGraph(args.missionaries, args.cannibals, args.capacity)
+    model = PlayerModel(
+        {move: float(w) for move, w in args.weight}, args.aversion, args.undo
+    )
+    report = analyze(graph, model, args.players, args.max_steps, seed=args.seed)
+    print(
+        "P(win) %.6f [%.6f, %.6f]  P(failure) %.6f [%.6f, %.6f]  P(timeout) %.6f"
+        % (
+            report["win"]["p"],
+            *report["win"]["ci95"],
+            report["failure"]["p"],
+            *report["failure"]["ci95"],
+            report["timeout"]["p"],
+        )
+    )
+    s = report["steps"]
+    print(
+        "steps to the end: mean %.2f  p50 %s  p90 %s  p99 %s"
+        % (s["mean"] or 0, s["p50"], s["p90"], s["p99"])
+    )
+    for d in report["dangerous"]:
+        print(
+            "%-14s lost %6.2f%% of %d visits"
+            % (d["state"], d["lossRate"] * 100, d["visits"])
+        )
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=1)
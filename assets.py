@@ -0,0 +1,131 @@
+import json
+import os
+import time
+import pygame
+from collections import OrderedDict
+
+
+class Assets:
+    """
+    registry of images, every image is loaded and converted
+    once and the same surface is shared by all objects using it.
+    Images are sliced from the atlas built by atlas.py when it exists,
+    images missing from it are loaded from their own files
+    """
+
+    # name: (path, has transparency)
+    IMAGES = {
+        "background": ("images/background.png", False),
+        "raft": ("images/raft.png", True),
+        "rhovered": ("images/rhovered.png", True),
+        "idle0": ("images/idle0.png", True),
+        "idle1": ("images/idle1.png", True),
+        "move0": ("images/move0.png", True),
+        "move1": ("images/move1.png", True),
+        "hovered": ("images/hovered.png", True),
+        "midle0": ("images/midle0.png", True),
+        "midle1": ("images/midle1.png", True),
+        "mmove0": ("images/mmove0.png", True),
+        "mmove1": ("images/mmove1.png", True),
+        "mhovered": ("images/mhovered.png", True),
+    }
+    FONT = "fonts/font.ttf"
+    ATLAS = "images/atlas.png"
+    INDEX = "images/atlas.json"
+    ATLASVERSION = 1
+    surfaces = {}
+    fonts = {}
+    # atlas surface and {name: rect}, None until first image is loaded
+    atlas = None
+    rects = None
+
+    @staticmethod
+    def font(size):
+        """returns font of given size, loads it on first use"""
+        font = Assets.fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(Assets.FONT, size)
+            Assets.fonts[size] = font
+        return font
+
+    @staticmethod
+    def get(name):
+        """returns ready to blit surface, loads it on first use"""
+        sur = Assets.surfaces.get(name)
+        if sur is None:
+            path, alpha = Assets.IMAGES[name]
+            if Assets.rects is None:
+                Assets.loadAtlas()
+            rect = Assets.rects.get(name)
+            if rect is not None:
+                sur = Assets.atlas.subsurface(rect)
+                # opaque images are copied out, they blit faster without alpha
+                sur = sur if alpha else sur.convert()
+            else:
+                sur = pygame.image.load(path)
+                sur = sur.convert_alpha() if alpha else sur.convert()
+            Assets.surfaces[name] = sur
+        return sur
+
+    @staticmethod
+    def loadAtlas():
+        """loads atlas and its index, no atlas leaves rects empty"""
+        Assets.rects = {}
+        if not (os.path.exists(Assets.INDEX) and os.path.exists(Assets.ATLAS)):
+            return
+        with open(Assets.INDEX) as f:
+            index = json.load(f)
+        if index.get("version") != Assets.ATLASVERSION:
+            return
+        Assets.atlas = pygame.image.load(Assets.ATLAS).convert_alpha()
+        Assets.rects = {
+            name: pygame.Rect(rect) for name, rect in index["rects"].items()
+        }
+
+    @staticmethod
+    def sheet(prefix, frames):
+        """returns animation frames named prefix0, prefix1..."""
+        return tuple(Assets.get(prefix + str(i)) for i in range(frames))
+
+    @staticmethod
+    def preload():
+        """loads every registered image, needs display mode to be set"""
+        for name in Assets.IMAGES:
+            Assets.get(name)
+
+    @staticmethod
+    def preloadStep(budget=0.004):
+        """
+        loads images not loaded yet until budget seconds are used up,
+        at least one, returns True while some are left
+        """
+        start = time.perf_counter()
+        for name in Assets.IMAGES:
+            if name not in Assets.surfaces:
+                Assets.get(name)
+                if time.perf_counter() - start >= budget:
+                    break
+        return len(Assets.surfaces) < len(Assets.IMAGES)
+
+
+class TextCache:
+    """
+    cache of rendered text surfaces keyed by
+    (text, font size, color, antialias), least recently used go first
+    """
+
+    maxSize = 256
+    surfaces = OrderedDict()
+
+    @staticmethod
+    def render(text, size, color, antialias=True):
+        key = (text, size, color, antialias)
+        sur = TextCache.surfaces.get(key)
+        if sur is not None:
+            TextCache.surfaces.move_to_end(key)
+            return sur
+        sur = Assets.font(size).render(text, antialias, color)
+        TextCache.surfaces[key] = sur
+        if len(TextCache.surfaces) > TextCache.maxSize:
+            TextCache.surfaces.popitem(last=False)
+        return sur
@@ -0,0 +1,83 @@
+"""
+packs every transparent image registered in Assets into one atlas image
+and a json index of their rects, Assets slices sprites from it at runtime.
+Opaque images like the background stay in their own files, they decode
+faster without an alpha channel
+
+    python atlas.py
+    python atlas.py --prune    (web build, removes the packed source images)
+"""
+
+import argparse
+import json
+import math
+import os
+import pygame
+from assets import Assets
+
+
+def pack(sizes, width):
+    """
+    shelf packing, tallest first, returns {key: (x, y)} and total height,
+    sizes is {key: (width, height)}
+    """
+    positions = {}
+    x = y = shelf = 0
+    for key in sorted(sizes, key=lambda k: (-sizes[k][1], -sizes[k][0], k)):
+        w, h = sizes[key]
+        if x + w > width:
+            x, y, shelf = 0, y + shelf, 0
+        positions[key] = (x, y)
+        x += w
+        shelf = max(shelf, h)
+    return positions, y + shelf
+
+
+def build(images=Assets.IMAGES, atlasPath=Assets.ATLAS, indexPath=Assets.INDEX):
+    """builds atlas and its index, identical images share one rect"""
+    surfaces = {}
+    names = {}
+    for name, (path, alpha) in images.items():
+        if not alpha:
+            continue
+        sur = pygame.image.load(path)
+        key = (sur.get_size(), pygame.image.tobytes(sur, "RGBA"))
+        surfaces.setdefault(key, sur)
+        names[name] = key
+    sizes = {key: sur.get_size() for key, sur in surfaces.items()}
+    area = sum(w * h for w, h in sizes.values())
+    width = max(max(w for w, h in sizes.values()), math.ceil(math.sqrt(area)))
+    positions, height = pack(sizes, width)
+    atlas = pygame.Surface((width, height), pygame.SRCALPHA)
+    for key, sur in surfaces.items():
+        # adding onto the transparent atlas copies pixels without blending
+        atlas.blit(sur, positions[key], special_flags=pygame.BLEND_RGBA_ADD)
+    pygame.image.save(atlas, atlasPath)
+    rects = {
+        name: [*positions[key], *sizes[key]] for name, key in sorted(names.items())
+    }
+    with open(indexPath, "w") as f:
+        json.dump(
+            {
+                "version": Assets.ATLASVERSION,
+                "image": os.path.basename(atlasPath),
+                "rects": rects,
+            },
+            f,
+            separators=(",", ":"),
+        )
+    return rects
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--prune", action="store_true")
+    args = parser.parse_args()
+    rects = build()
+    print(
+        "packed %d images into %s, %d bytes"
+        % (len(rects), Assets.ATLAS, os.path.getsize(Assets.ATLAS))
+    )
+    if args.prune:
+        for name in rects:
+            os.remove(Assets.IMAGES[name][0])
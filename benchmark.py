@@ -0,0 +1,224 @@
+"""
+headless rendering benchmark of the real Game and UI objects
+
+    python benchmark.py --counts 3 30 300 --out bench.json
+    python benchmark.py --compare old.json bench.json
+"""
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import gc
+import json
+import platform
+import random
+import time
+import tracemalloc
+import numpy as np
+import pygame
+import main
+from scheduler import Scheduler, VirtualClock
+from stategraph import StateGraph
+
+PLAY = (640, 510)
+
+
+def play(ui, game):
+    main.ButtonActions.OnPlay(ui, game)
+
+
+def menuFrame(ui, game, frame):
+    # moves mouse over play button and away from it
+    if frame % 60 == 0:
+        main.MouseClass.mousePos = PLAY if frame % 120 == 0 else (0, 0)
+
+
+def boardingFrame(ui, game, frame):
+    # first two characters get on the raft and off again
+    if frame % 130 == 0:
+        for obj in (main.Game.cannibals + main.Game.missionaries)[:2]:
+            obj.onClick()
+
+
+def crossingSetup(ui, game):
+    play(ui, game)
+    main.Game.cannibals[0].onClick()
+    main.Game.missionaries[0].onClick()
+
+
+def crossingFrame(ui, game, frame):
+    if frame % 400 == 130:
+        main.Game.raft.onClick()
+
+
+def tweensFrame(ui, game, frame):
+    # every character walks somewhere at once
+    if frame % 130 == 0:
+        rand = random.Random(frame)
+        for obj in main.Game.cannibals + main.Game.missionaries:
+            obj.moveTo((rand.randrange(100, 1180), rand.randrange(300, 650)), 1)
+
+
+def lossSetup(ui, game):
+    play(ui, game)
+    game.onLoss()
+
+
+def winSetup(ui, game):
+    play(ui, game)
+    session = main.Game.session
+    previous, session.state = session.state, main.gameGraph.win
+    session.outcome = main.gameGraph.outcome(session.state)
+    main.Transitions.change(previous, session.state)
+
+
+def restartFrame(ui, game, frame):
+    # back to the menu and straight into a new game
+    if frame % 60 == 0:
+        main.ButtonActions.startAgain(ui, game)
+        play(ui, game)
+
+
+def nothing(ui, game, frame):
+    pass
+
+
+# name: (setup, called before every frame)
+SCENARIOS = {
+    "menu": (lambda ui, game: None, menuFrame),
+    "boarding": (play, boardingFrame),
+    "crossing": (crossingSetup, crossingFrame),
+    "tweens": (play, tweensFrame),
+    "loss": (lossSetup, nothing),
+    "win": (winSetup, nothing),
+    "restart": (play, restartFrame),
+}
+
+
+def run(scenario, count, frames, traced, vectorMotion=False, layered=False):
+    """plays scenario with count characters of each kind on a virtual clock"""
+    setup, step = SCENARIOS[scenario]
+    main.gameGraph = StateGraph(count, count, 2)
+    game = main.Game((1280, 720), vectorMotion=vectorMotion, layered=layered)
+    clock = VirtualClock()
+    main.Game.asyncTasks = Scheduler(clock)
+    ui = main.UI(game.scr)
+    ui.createMenu()
+    setup(ui, game)
+    frameMs = 1000 / main.Game.frameRate
+
+    gc.collect()
+    if traced:
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+    times = np.zeros(frames)
+    allocated = 0
+    for frame in range(frames):
+        step(ui, game, frame)
+        if traced:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        main.runFrame(ui, game)
+        times[frame] = time.perf_counter() - start
+        if traced:
+            allocated += tracemalloc.get_traced_memory()[1] - before
+        clock.advance(frameMs)
+    result = {"times": times, "tasks": main.Game.activeTasks()}
+    if traced:
+        result["allocated"] = allocated
+        result["growth"] = tracemalloc.get_traced_memory()[0] - base
+        tracemalloc.stop()
+    return result
+
+
+def benchmark(scenarios, counts, frames, vectorMotion=False, layered=False):
+    results = []
+    for scenario in scenarios:
+        for count in counts:
+            timed = run(scenario, count, frames, False, vectorMotion, layered)
+            traced = run(scenario, count, frames, True, vectorMotion, layered)
+            ms = timed["times"] * 1000
+            results.append(
+                {
+                    "scenario": scenario,
+                    "count": count,
+                    "fps": frames / timed["times"].sum(),
+                    "frameMs": {
+                        "p50": float(np.percentile(ms, 50)),
+                        "p95": float(np.percentile(ms, 95)),
+                        "p99": float(np.percentile(ms, 99)),
+                    },
+                    "allocKiBPerFrame": traced["allocated"] / frames / 1024,
+                    "memoryGrowthKiB": traced["growth"] / 1024,
+                    "tasks": timed["tasks"],
+                }
+            )
+            r = results[-1]
+            print(
+                "%-9s %5d  %9.1f fps  p99 %7.2f ms  %8.1f KiB/frame  %+9.1f KiB"
+                % (
+                    scenario,
+                    count,
+                    r["fps"],
+                    r["frameMs"]["p99"],
+                    r["allocKiBPerFrame"],
+                    r["memoryGrowthKiB"],
+                )
+            )
+    return {
+        "version": 1,
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "frames": frames,
+        "vectorMotion": vectorMotion,
+        "layered": layered,
+        "results": results,
+    }
+
+
+def compare(oldPath, newPath):
+    """prints fps and allocation change of every run present in both files"""
+    with open(oldPath) as f:
+        old = {(r["scenario"], r["count"]): r for r in json.load(f)["results"]}
+    with open(newPath) as f:
+        new = json.load(f)["results"]
+    for r in new:
+        o = old.get((r["scenario"], r["count"]))
+        if o is None:
+            continue
+        print(
+            "%-9s %5d  fps %9.1f -> %9.1f (%+6.1f%%)  KiB/frame %8.1f -> %8.1f"
+            % (
+                r["scenario"],
+                r["count"],
+                o["fps"],
+                r["fps"],
+                (r["fps"] / o["fps"] - 1) * 100,
+                o["allocKiBPerFrame"],
+                r["allocKiBPerFrame"],
+            )
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS))
+    parser.add_argument("--counts", nargs="+", type=int, default=[3, 30, 300])
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--out", default="bench.json")
+    parser.add_argument("--vector-motion", action="store_true")
+    parser.add_argument("--layered", action="store_true")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+    else:
+        report = benchmark(
+            args.scenarios, args.counts, args.frames, args.vector_motion, args.layered
+        )
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=1)
@@ -0,0 +1,263 @@
+"""
+renders a recorded or scripted session offscreen with the drawing code
+of the game, frame by frame on a virtual clock. The frames are split
+into time ranges rendered by worker processes, each one streams its
+frames into its own ffmpeg and the parts get joined at the end. Without
+ffmpeg the frames are written as png files instead
+
+    python export.py session.mcr --out clip.mp4
+    python export.py --out demo.gif --fps 25    (scripted session)
+    python export.py session.mcr --png --out frames
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import pygame
+import replay
+
+# codec arguments of the parts, gif parts stay lossless until the palette
+# of the whole clip is known
+H264 = ["-c:v", "libx264", "-pix_fmt", "yuv420p", "-crf", "18"]
+LOSSLESS = ["-c:v", "ffv1"]
+
+
+def scripted():
+    """
+    records of a session that starts the game, shows the hint and
+    lets auto solve play it to the end
+    """
+    play = (640, 510)
+    return [
+        (replay.EVENT, 500, pygame.MOUSEMOTION, *play, 0),
+        (replay.EVENT, 1000, pygame.MOUSEBUTTONDOWN, *play, 1),
+        (replay.EVENT, 2000, pygame.KEYDOWN, 0, 0, pygame.K_h),
+        (replay.EVENT, 3000, pygame.KEYDOWN, 0, 0, pygame.K_a),
+    ]
+
+
+def frameTime(index, fps):
+    return round(index * 1000 / fps)
+
+
+class Playback:
+    """
+    session played back at a fixed frame rate, input events are posted
+    in the first frame at or after their time so every process that
+    plays the same records at the same rate sees the same frames
+    """
+
+    def __init__(self, variant, records, fps):
+        # no window, no sound
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+        self.main, self.game, self.ui, self.clock = replay.headless(variant)
+        # animations count frames of the game's frame rate
+        self.game.pacer.frames = max(round(self.main.Game.frameRate / fps), 1)
+        self.fps = fps
+        self.events = replay.eventsByTime(records)
+        self.times = sorted(self.events)
+        self.next = 0
+        self.index = 0
+        self.quit = False
+
+    def step(self, draw=True):
+        """runs the next frame, draw=False animates without drawing"""
+        self.clock.now = frameTime(self.index, self.fps)
+        pygame.event.clear()
+        while self.next < len(self.times) and self.times[self.next] <= self.clock.now:
+            for event in self.events[self.times[self.next]]:
+                if event.type == pygame.QUIT:
+                    self.quit = True
+                else:
+                    pygame.event.post(event)
+            self.next += 1
+        self.main.runFrame(self.ui, self.game, draw)
+        if not draw:
+            self.game.update(self.game.pacer.frames)
+        self.index += 1
+
+    def finished(self):
+        """True when no input is left and nothing moves anymore"""
+        main = self.main
+        solving = main.Hints.auto and main.Game.playing
+        return self.quit or (
+            self.next == len(self.times)
+            and main.Game.activeTasks() == 0
+            and not solving
+        )
+
+
+def length(variant, records, fps, tail, limit):
+    """
+    frames of the session, played without drawing until it's finished,
+    tail seconds are added unless it ends with the window closing
+    """
+    playback = Playback(variant, records, fps)
+    while not playback.finished() and playback.index < limit:
+        playback.step(False)
+    if playback.quit:
+        return playback.index
+    return min(playback.index + round(tail * fps), limit)
+
+
+class PngWriter:
+    """writes frames as numbered png files into directory"""
+
+    def __init__(self, directory, first):
+        self.directory = directory
+        self.index = first
+
+    def write(self, sur):
+        path = os.path.join(self.directory, "frame%06d.png" % self.index)
+        pygame.image.save(sur, path)
+        self.index += 1
+
+    def close(self):
+        pass
+
+
+class FfmpegWriter:
+    """pipes raw frames into an ffmpeg process encoding them into path"""
+
+    def __init__(self, ffmpeg, path, size, fps, codec):
+        self.path = path
+        self.process = subprocess.Popen(
+            [ffmpeg, "-loglevel", "error", "-y", "-f", "rawvideo"]
+            + ["-pix_fmt", "rgb24", "-s", "%dx%d" % size, "-r", str(fps)]
+            + ["-i", "-"]
+            + codec
+            + [path],
+            stdin=subprocess.PIPE,
+        )
+
+    def write(self, sur):
+        self.process.stdin.write(pygame.image.tobytes(sur, "RGB"))
+
+    def close(self):
+        self.process.stdin.close()
+        if self.process.wait() != 0:
+            raise RuntimeError("ffmpeg failed to encode " + self.path)
+
+
+def renderRange(job):
+    """
+    renders frames first to last - 1 of a session, the frames before
+    first are played without drawing. Returns number of frames rendered
+    """
+    variant, records, fps, first, last, target, ffmpeg, codec = job
+    playback = Playback(variant, records, fps)
+    while playback.index < first:
+        playback.step(False)
+    scr = playback.game.scr
+    if ffmpeg != None:
+        writer = FfmpegWriter(ffmpeg, target, scr.get_size(), fps, codec)
+    else:
+        writer = PngWriter(target, first)
+    try:
+        while playback.index < last:
+            playback.step()
+            writer.write(scr)
+    finally:
+        writer.close()
+    return last - first
+
+
+def join(ffmpeg, parts, path):
+    """joins encoded parts into path, gifs get a palette made for the clip"""
+    listing = os.path.join(os.path.dirname(parts[0]), "parts.txt")
+    with open(listing, "w") as f:
+        for part in parts:
+            f.write("file '%s'\n" % os.path.abspath(part))
+    if path.lower().endswith(".gif"):
+        output = ["-vf", "split[a][b];[a]palettegen[p];[b][p]paletteuse"]
+    else:
+        output = ["-c", "copy"]
+    subprocess.run(
+        [ffmpeg, "-loglevel", "error", "-y", "-f", "concat", "-safe", "0"]
+        + ["-i", listing]
+        + output
+        + [path],
+        check=True,
+    )
+
+
+def export(variant, records, out, fps=30, workers=None, tail=2, limit=600, ffmpeg=None):
+    """
+    renders the session into video file out with ffmpeg, or into png
+    frames in directory out when ffmpeg is None, tail and limit are in
+    seconds. Returns number of frames
+    """
+    # fresh process for every job, the game keeps its state in module globals
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        frames = pool.apply(length, (variant, records, fps, tail, limit * fps))
+    workers = max(1, min(workers or os.cpu_count() or 1, frames))
+    bounds = [frames * i // workers for i in range(workers + 1)]
+    temp = None
+    if ffmpeg != None:
+        gif = out.lower().endswith(".gif")
+        codec = LOSSLESS if gif else H264
+        extension = ".mkv" if gif else os.path.splitext(out)[1]
+        temp = tempfile.mkdtemp(
+            prefix=".export-", dir=os.path.dirname(os.path.abspath(out))
+        )
+        targets = [
+            os.path.join(temp, "part%03d%s" % (i, extension)) for i in range(workers)
+        ]
+    else:
+        codec = None
+        os.makedirs(out, exist_ok=True)
+        targets = [out] * workers
+    jobs = [
+        (variant, records, fps, bounds[i], bounds[i + 1], targets[i], ffmpeg, codec)
+        for i in range(workers)
+    ]
+    try:
+        with context.Pool(workers, maxtasksperchild=1) as pool:
+            rendered = sum(pool.imap_unordered(renderRange, jobs))
+        if ffmpeg != None:
+            join(ffmpeg, targets, out)
+    finally:
+        if temp != None:
+            shutil.rmtree(temp, ignore_errors=True)
+    return rendered
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("recording", nargs="?", default=None)
+    parser.add_argument("--out", default="export.mp4")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--tail", type=float, default=2)
+    parser.add_argument("--limit", type=float, default=600)
+    parser.add_argument("--png", action="store_true")
+    args = parser.parse_args()
+    if args.recording != None:
+        variant, records = replay.load(args.recording)
+    else:
+        variant, records = (3, 3, 2), scripted()
+    ffmpeg = None if args.png else shutil.which("ffmpeg")
+    out = args.out
+    if ffmpeg is None and os.path.splitext(out)[1]:
+        out = os.path.splitext(out)[0]
+        print("no ffmpeg, writing png frames into " + out)
+    start = time.perf_counter()
+    frames = export(
+        variant, records, out, args.fps, args.workers, args.tail, args.limit, ffmpeg
+    )
+    print(
+        "rendered %d frames, %.1f s at %d fps, in %.1f s into %s"
+        % (
+            frames,
+            frames / args.fps,
+            args.fps,
+            time.perf_counter() - start,
+            out,
+        )
+    )
@@ -0,0 +1,223 @@
+"""
+on-disk cache of compiled transition tables and solver distances, one
+file per variant opened with mmap, so processes opening the same variant
+share one read-only copy of it in memory
+
+    python graphcache.py 300 300 2
+"""
+
+import argparse
+import hashlib
+import inspect
+import mmap
+import os
+import struct
+import time
+import zlib
+import numpy as np
+from solver import Solver
+from stategraph import StateGraph
+
+DIRECTORY = ".graphcache"
+MAGIC = b"MCGRAPH\0"
+FORMAT = 1
+# magic, format, missionaries, cannibals, capacity, code hash,
+# table itemsize, payload size, payload crc32
+HEADER = struct.Struct("<8sIIII20sIQI")
+ALIGN = 64
+
+codeHash = None
+
+
+def version():
+    """
+    hash of the code that builds the tables, files of older code are
+    stale. None when the code has no sources, e.g. in a build shipped
+    as bytecode, then nothing gets cached
+    """
+    global codeHash
+    if codeHash is None:
+        try:
+            source = "".join(
+                inspect.getsource(f)
+                for f in (
+                    StateGraph.__init__,
+                    StateGraph.build,
+                    Solver.reverseEdges,
+                    Solver.solve,
+                )
+            )
+        except (OSError, TypeError):
+            codeHash = b""
+        else:
+            source += str(FORMAT)
+            codeHash = hashlib.sha1(source.encode()).digest()
+    return codeHash or None
+
+
+def path(missionaries, cannibals, capacity, directory=DIRECTORY):
+    return os.path.join(
+        directory,
+        "%d-%d-%d-%s.bin" % (missionaries, cannibals, capacity, version().hex()[:12]),
+    )
+
+
+def layout(size, moves, itemsize):
+    """(name, dtype, shape, offset) of every array, and payload size"""
+    arrays = []
+    offset = 0
+    for name, dtype, shape in (
+        ("table", np.dtype("<i%d" % itemsize), (size, moves)),
+        ("failure", np.dtype(bool), (size,)),
+        ("terminal", np.dtype(bool), (size,)),
+        ("distance", np.dtype("<i4"), (size,)),
+        ("bestMove", np.dtype("<i4"), (size,)),
+    ):
+        arrays.append((name, dtype, shape, offset))
+        offset += -(-int(np.prod(shape)) * dtype.itemsize // ALIGN) * ALIGN
+    return arrays, offset
+
+
+def save(graph, solver, directory=DIRECTORY):
+    """
+    writes tables of graph and solver atomically, returns file path or
+    None when there's no version to write them under
+    """
+    if version() is None:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    target = path(graph.missionaries, graph.cannibals, graph.capacity, directory)
+    itemsize = graph.table.dtype.itemsize
+    arrays, total = layout(graph.size, len(graph.moves), itemsize)
+    payload = bytearray(total)
+    for name, dtype, shape, offset in arrays:
+        source = graph if hasattr(graph, name) else solver
+        data = np.ascontiguousarray(getattr(source, name), dtype=dtype)
+        payload[offset : offset + data.nbytes] = data.tobytes()
+    header = HEADER.pack(
+        MAGIC,
+        FORMAT,
+        graph.missionaries,
+        graph.cannibals,
+        graph.capacity,
+        version(),
+        itemsize,
+        total,
+        zlib.crc32(payload),
+    )
+    temp = target + ".%d.tmp" % os.getpid()
+    with open(temp, "wb") as f:
+        f.write(header.ljust(ALIGN, b"\0"))
+        f.write(payload)
+    os.replace(temp, target)
+    # files of the variant written by older code
+    prefix = "%d-%d-%d-" % (graph.missionaries, graph.cannibals, graph.capacity)
+    for name in os.listdir(directory):
+        stale = os.path.join(directory, name)
+        if name.startswith(prefix) and name.endswith(".bin") and stale != target:
+            os.remove(stale)
+    return target
+
+
+def read(missionaries, cannibals, capacity, directory=DIRECTORY, verify=True):
+    """
+    maps cached tables of a variant, returns (graph, solver) with read-only
+    arrays or None when there's no valid file. A file that doesn't match
+    its header, size or checksum is deleted so it gets rebuilt
+    """
+    if version() is None:
+        return None
+    target = path(missionaries, cannibals, capacity, directory)
+    try:
+        with open(target, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        # empty file, mmap can't map it
+        discard(target)
+        return None
+    except OSError:
+        return None
+    graph = StateGraph(missionaries, cannibals, capacity, tables=(None,) * 3)
+    expected = (MAGIC, FORMAT, missionaries, cannibals, capacity, version())
+    try:
+        magic, fmt, m, c, k, code, itemsize, total, crc = HEADER.unpack_from(data)
+        arrays, size = layout(graph.size, len(graph.moves), itemsize)
+        if (
+            (magic, fmt, m, c, k, code) != expected
+            or total != size
+            or len(data) != ALIGN + total
+            or (verify and zlib.crc32(memoryview(data)[ALIGN:]) != crc)
+        ):
+            raise ValueError("corrupt or stale graph cache " + target)
+    except (struct.error, ValueError):
+        data.close()
+        discard(target)
+        return None
+    views = {}
+    for name, dtype, shape, offset in arrays:
+        count = int(np.prod(shape))
+        views[name] = np.frombuffer(data, dtype, count, ALIGN + offset).reshape(shape)
+    graph.failure = views["failure"]
+    graph.terminal = views["terminal"]
+    graph.table = views["table"]
+    return graph, Solver(graph, (views["distance"], views["bestMove"]))
+
+
+def discard(target):
+    try:
+        os.remove(target)
+    except OSError:
+        pass
+
+
+def load(missionaries, cannibals, capacity, directory=DIRECTORY):
+    """
+    cached (graph, solver) of a variant, builds and caches them when
+    the file is missing, stale or corrupt
+    """
+    cached = read(missionaries, cannibals, capacity, directory)
+    if cached is not None:
+        return cached
+    graph = StateGraph(missionaries, cannibals, capacity)
+    solver = Solver(graph)
+    try:
+        save(graph, solver, directory)
+    except OSError:
+        # read-only or missing file system, e.g. in the browser
+        pass
+    return graph, solver
+
+
+def cached(missionaries, cannibals, capacity, directory=DIRECTORY):
+    """
+    (graph, solver) when a valid file is present, a newly built graph
+    and None otherwise, solving it is left until it's needed
+    """
+    tables = read(missionaries, cannibals, capacity, directory)
+    if tables is not None:
+        return tables
+    return StateGraph(missionaries, cannibals, capacity), None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("missionaries", type=int)
+    parser.add_argument("cannibals", type=int)
+    parser.add_argument("capacity", type=int)
+    parser.add_argument("--directory", default=DIRECTORY)
+    args = parser.parse_args()
+    variant = (args.missionaries, args.cannibals, args.capacity)
+    start = time.perf_counter()
+    Solver(StateGraph(*variant))
+    built = time.perf_counter() - start
+    load(*variant, args.directory)
+    opened = []
+    for verify in (True, False):
+        start = time.perf_counter()
+        g, s = read(*variant, args.directory, verify)
+        opened.append((time.perf_counter() - start) * 1000)
+    print(
+        "%s: %d states, built and solved in %.1f ms, "
+        "opened in %.1f ms, %.1f ms without checksum"
+        % (path(*variant, args.directory), g.size, built * 1000, *opened)
+    )
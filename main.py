@@ -1,6 +1,27 @@
+import time
+
+# cold start is measured from here, before the heavy imports
+startTime = time.perf_counter()
 import pygame
 import sys
 import asyncio
+import atexit
+import math
+from assets import Assets, TextCache
+from scheduler import Scheduler
+from render import DirtyRects, Compositor, Fade
+from spatial import SpatialGrid
+from profiler import FrameProfiler
+from motion import MotionSystem
+from solver import Solver
+from pacing import FramePacer
+from replay import Recorder
+from telemetry import Telemetry
+from session import BOARDTIME, CROSSTIME, GameSession
+import graphcache
+
+# names of the banks indexed by session.LEFT and session.RIGHT
+SIDES = ("left", "right")
 
 
 class Colors:
@@ -15,6 +36,25 @@ class Colors:
     GREY = (70, 70, 70)
 
 
+class Transitions:
+    """
+    publishes every change of the session's graphstate, subscribers get
+    called once per change with (previous state, new state, move id or None)
+    """
+
+    subscribers = []
+
+    @staticmethod
+    def subscribe(callback):
+        Transitions.subscribers.append(callback)
+
+    @staticmethod
+    def change(previous, state, move=None):
+        """tells every subscriber"""
+        for callback in list(Transitions.subscribers):
+            callback(previous, state, move)
+
+
 class UIField:
     """Class handling user interface objects"""
 
@@ -24,9 +64,9 @@ class UIField:
         self.center = center
         self.text = text
         if big:
-            self.box = Game.FontBIG.render(text, True, Colors.RED)
+            self.box = TextCache.render(text, Game.bigFontSize, Colors.RED)
         else:
-            self.box = Game.Font.render(text, True, Colors.WHITE)
+            self.box = TextCache.render(text, Game.fontSize, Colors.WHITE)
         self.rect = self.box.get_rect()
         self.rect.center = center
 
@@ -34,10 +74,11 @@ class UIField:
         scr.blit(self.box, self.rect)
 
     def updateText(self, text):
+        self.text = text
         if self.big:
-            self.box = Game.FontBIG.render(text, True, Colors.RED)
+            self.box = TextCache.render(text, Game.bigFontSize, Colors.RED)
         else:
-            self.box = Game.Font.render(text, True, Colors.WHITE)
+            self.box = TextCache.render(text, Game.fontSize, Colors.WHITE)
         self.rect = self.box.get_rect()
         self.rect.center = self.center
 
@@ -51,8 +92,13 @@ class ButtonActions:
     @staticmethod
     def OnPlay(ui, game):
         """prepare game"""
+        game.latency["play"] = time.perf_counter()
+        if "firstPlay" not in game.profiler.milestones:
+            game.latency["firstPlay"] = time.perf_counter()
         ui.createGameUI()
-        game.createBackground("images/background.png")
+        Game.session = GameSession(gameGraph, Game.asyncTasks)
+        Game.playing = True
+        game.createBackground("background")
         game.instantiateRaft()
         game.instantiateCandM()
 
@@ -67,15 +113,25 @@ class ButtonActions:
 
     @staticmethod
     def startAgain(ui, game):
-        """resets the game to the beginning"""
+        """
+        resets the game to the beginning, entities and ui
+        objects stay pooled for the next game
+        """
+        game.latency["restart"] = time.perf_counter()
+        Game.playing = False
+        previous = Game.state()
+        Game.session = None
         Game.gameObjects = []
         Game.cannibals = []
         Game.missionaries = []
-        Game.asyncTasks = []
+        Game.asyncTasks.clear()
+        Hints.reset()
+        if Game.motion != None:
+            Game.motion.clear()
+        MouseClass.index.clear()
         UI.objs = []
-        global graphstate
-        graphstate = "-cccmmmb"
         game.dimSur = None
+        Transitions.change(previous, Game.state())
         ui.createMenu()
 
 
@@ -87,28 +143,27 @@ class Button(UIField):
         self.center = center
         self.text = text
         self.z = z
-        self.box = Game.Font.render(text, True, Colors.WHITE)
+        self.box = TextCache.render(text, Game.fontSize, Colors.WHITE)
         self.rect = self.box.get_rect()
         self.rect.center = center
         self.onClick = onClick if onClick != None else ButtonActions.doNothing
 
     def onHover(self):
         """called when mouse is pointing the button"""
-        self.box = Game.Font.render(self.text, True, Colors.RED)
+        self.box = TextCache.render(self.text, Game.fontSize, Colors.RED)
         self.rect = self.box.get_rect()
         self.rect.center = self.center
 
     def unHover(self):
         """called when mouse is no longer pointing the button"""
-        self.box = Game.Font.render(self.text, True, Colors.WHITE)
+        self.box = TextCache.render(self.text, Game.fontSize, Colors.WHITE)
         self.rect = self.box.get_rect()
         self.rect.center = self.center
 
 
 class GameObject:
-    def __init__(self, imgPath):
-        self.img = pygame.image.load(imgPath)
-        self.img = self.img.convert()
+    def __init__(self, imgName):
+        self.img = Assets.get(imgName)
         self.rect = self.img.get_rect()
         self.animTick = 0
         self.state = "idle"
@@ -122,38 +177,42 @@ class GameObject:
         h = self.rect.height
         self.rect = pygame.Rect(valuex - w / 2, valuey - h / 2, w, h)
 
-    def moveToAsync(self, args):
-        """gets called multiple of times asynchronously"""
-        # args = (startPos,endPos,startTime,time)
-        startPos = args["startPos"]
-        endPos = args["endPos"]
-        startTime = args["startTime"]
-        time = args["duration"]
+    @staticmethod
+    def crowdPos(slot, count, area):
+        """
+        center of slot in a grid filling area (left, top, width, height),
+        for crowds too big for the usual line of three on a bank
+        """
+        left, top, width, height = area
+        cols = max(1, math.ceil(math.sqrt(count * width / height)))
+        rows = math.ceil(count / cols)
+        return (
+            round(left + (slot % cols + 0.5) * width / cols),
+            round(top + (slot // cols + 0.5) * height / rows),
+        )
+
+    def moveToAsync(self, startPos, endPos, t):
+        """gets called every frame while moving"""
         self.state = "move"
-        curTime = (pygame.time.get_ticks() - startTime) / (1000 * time)
-        self.lerp(startPos, endPos, curTime)
-        # when its finished
-        if curTime >= 1:
-            for task in Game.asyncTasks:
-                if task["args"] == args:
-                    self.state = "idle"
-                    self.animTick = 0
-                    self.animCounter = 0
-                    Game.asyncTasks.remove(task)
+        self.lerp(startPos, endPos, t)
+        MouseClass.index.update(self)
+
+    def onMoveDone(self):
+        self.state = "idle"
+        self.animTick = 0
+        self.animCounter = 0
 
     def moveTo(self, endPos, time):
-        """starts asynchornous call"""
-        Game.asyncTasks.append(
-            {
-                "obj": self,
-                "func": "moveToAsync",
-                "args": {
-                    "startPos": self.rect.center,
-                    "endPos": endPos,
-                    "startTime": pygame.time.get_ticks(),
-                    "duration": time,
-                },
-            }
+        """starts asynchornous move, returns its task"""
+        if Game.motion != None:
+            self.state = "move"
+            now = Game.asyncTasks.time()
+            return Game.motion.move(self, endPos, time, now, self.onMoveDone)
+        startPos = self.rect.center
+        return Game.asyncTasks.tween(
+            time,
+            lambda t: self.moveToAsync(startPos, endPos, t),
+            self.onMoveDone,
         )
 
 
@@ -161,114 +220,94 @@ class Raft(GameObject):
     """Handles the raft object"""
 
     def __init__(self):
-        self.img = pygame.image.load("images/raft.png")
-        self.img = self.img.convert_alpha()
-        self.rect = self.img.get_rect()
+        self.idleImg = Assets.get("raft")
+        self.hoverImg = Assets.get("rhovered")
+        self.rect = self.idleImg.get_rect()
         self.pos = {"right": (830, 650), "left": (430, 650)}
-        self.rect.center = (830, 650)
-        Raft.slot1 = {
-            "person": None,
-            "pos": (self.rect.left + 50, self.rect.bottom - 150),
-        }
-        Raft.slot2 = {
-            "person": None,
-            "pos": (self.rect.right - 50, self.rect.bottom - 150),
-        }
+        self.reset()
+
+    def reset(self):
+        """puts raft back on the right bank, idle"""
+        self.img = self.idleImg
+        self.rect.center = self.pos["right"]
         self.animTick = 0
         Raft.state = "idle"
-        Raft.side = "right"
-        self.otherside = "left"
         self.animCounter = 0
 
-    def moveBoat(self, args):
+    @staticmethod
+    def side():
+        """bank the raft is at, or leaves from while crossing"""
+        return SIDES[Game.session.raftSide]
+
+    @staticmethod
+    def otherSide():
+        return SIDES[1 - Game.session.raftSide]
+
+    @staticmethod
+    def seat(rect, index):
+        """center of the rider in slot index of the session on a raft at rect"""
+        last = max(gameGraph.capacity - 1, 1)
+        x = rect.left + 50 + (rect.width - 100) * index // last
+        return (x, rect.bottom - 150)
+
+    @staticmethod
+    def riders():
+        """(slot index, character) of everyone on board"""
+        return [
+            (index, Game.person(person))
+            for index, person in enumerate(Game.session.slots)
+            if person != None
+        ]
+
+    def moveBoat(self, t):
         """asynchornous method, moves the boat"""
         Raft.state = "move"
-
-        startPos = self.pos[Raft.side]
-        endPos = self.pos[self.otherside]
-        startTime = args["startTime"]
-        time = args["duration"]
-        curTime = (pygame.time.get_ticks() - startTime) / (1000 * time)
-        self.lerp(startPos, endPos, curTime)
-
-        a = Raft.slot1["person"]
-        b = Raft.slot2["person"]
-
-        if a != None:
-            a.rect.center = (self.rect.left + 50, self.rect.bottom - 150)
-        if b != None:
-            b.rect.center = (self.rect.right - 50, self.rect.bottom - 150)
-        # when it's finished
-        if curTime >= 1:
-            for task in Game.asyncTasks:
-                if task["args"] == args:
-                    Raft.state = "idle"
-                    temp = Raft.side
-                    Raft.side = self.otherside
-                    self.otherside = temp
-                    if a != None:
-                        a.side = Raft.side
-                    Raft.slot1["pos"] = (self.rect.left + 50, self.rect.bottom - 150)
-                    if b != None:
-                        b.side = Raft.side
-                    Raft.slot2["pos"] = (self.rect.right - 50, self.rect.bottom - 150)
-                    global graphstate
-                    if isinstance(a, Cannibal) and b is None:
-                        graphstate = gameGraph[graphstate]["c"]
-                    elif isinstance(b, Cannibal) and a is None:
-                        graphstate = gameGraph[graphstate]["c"]
-                    elif isinstance(a, Cannibal) and isinstance(b, Cannibal):
-                        graphstate = gameGraph[graphstate]["2c"]
-                    elif isinstance(a, Missionary) and b is None:
-                        graphstate = gameGraph[graphstate]["m"]
-                    elif isinstance(b, Missionary) and a is None:
-                        graphstate = gameGraph[graphstate]["m"]
-                    elif isinstance(a, Missionary) and isinstance(b, Missionary):
-                        graphstate = gameGraph[graphstate]["2m"]
-                    elif isinstance(a, Cannibal) and isinstance(b, Missionary):
-                        graphstate = gameGraph[graphstate]["cm"]
-                    elif isinstance(a, Missionary) and isinstance(b, Cannibal):
-                        graphstate = gameGraph[graphstate]["cm"]
-
-                    Game.asyncTasks.remove(task)
+        self.lerp(self.pos[Raft.side()], self.pos[Raft.otherSide()], t)
+        MouseClass.index.update(self)
+        for index, person in Raft.riders():
+            person.rect.center = Raft.seat(self.rect, index)
+            MouseClass.index.update(person)
+
+    def onArrive(self):
+        """gets called when the boat reaches the other side"""
+        previous = Game.session.state
+        move = Game.session.arrive()
+        Raft.state = "idle"
+        Game.log("arrive", side=Raft.side(), move=gameGraph.moveNames[move])
+        Transitions.change(previous, Game.session.state, move)
 
     def anim(self):
         """animates the boat"""
         if self.state == "idle" or self.state == "move":
-            self.img = pygame.image.load("images/raft.png")
-            self.img = self.img.convert_alpha()
+            self.img = self.idleImg
         if self.state == "hovered":
-            self.img = pygame.image.load("images/rhovered.png")
-            self.img = self.img.convert_alpha()
+            self.img = self.hoverImg
             Raft.state = "idle"
 
     def onClick(self):
         """gets called when boat is clicked and handles click"""
-        self.img = pygame.image.load("images/raft.png")
-        self.img = self.img.convert_alpha()
-        c1 = Raft.slot1["person"]
-        c2 = Raft.slot2["person"]
-        if (
-            (c1 != None and c1.state == "idle" and c2 is None and self.state == "idle")
-            or (
-                c2 != None
-                and c2.state == "idle"
-                and c1 is None
-                and self.state == "idle"
-            )
-            or (
-                c1 != None
-                and c2 != None
-                and c1.state == c2.state == self.state == "idle"
-            )
-        ):
-            Game.asyncTasks.append(
-                {
-                    "obj": self,
-                    "func": "moveBoat",
-                    "args": {"startTime": pygame.time.get_ticks(), "duration": 3},
-                }
-            )
+        self.img = self.idleImg
+        if not Game.session.launch():
+            return
+        Raft.state = "move"
+        Game.log(
+            "depart",
+            side=Raft.side(),
+            riders=[MouseClass.name(person) for _, person in Raft.riders()],
+        )
+        if Game.motion != None:
+            self.moveBoatVectorized(CROSSTIME)
+        else:
+            Game.asyncTasks.tween(CROSSTIME, self.moveBoat, self.onArrive)
+
+    def moveBoatVectorized(self, time):
+        """moves the boat and its riders with Game.motion"""
+        now = Game.asyncTasks.time()
+        end = self.rect.copy()
+        end.center = self.pos[Raft.otherSide()]
+        for index, person in Raft.riders():
+            Game.motion.move(person, Raft.seat(end, index), time, now)
+        Game.motion.move(self, end.center, time, now, self.onArrive)
 
     def onHover(self):
         """changes raft's state to hovoered"""
@@ -276,28 +315,70 @@ class Raft(GameObject):
             Raft.state = "hovered"
 
 
-class Cannibal(GameObject):
+class Person(GameObject):
+    """
+    cannibal or missionary, boarding and leaving the raft follow the rules
+    of Game.session where people are numbered, missionaries first
+    """
+
+    def onClick(self):
+        """
+        boards or leaves the raft when the session allows it, the
+        person counts as moving until the walk is over
+        """
+        session = Game.session
+        if not session.toggle(self.person):
+            return
+        if self.person in session.slots:
+            seat = Raft.seat(Game.raft.rect, session.slots.index(self.person))
+            self.moveTo(seat, BOARDTIME)
+        else:
+            self.moveTo(self.pos[self.side], BOARDTIME)
+
+    @property
+    def side(self):
+        """bank the person is on, the raft's bank while aboard"""
+        if Game.session is None:
+            return "right"
+        return SIDES[Game.session.sides[self.person]]
+
+    def onMoveDone(self):
+        GameObject.onMoveDone(self)
+        if Game.session != None:
+            Game.session.boarded((self.person,))
+
+
+class Cannibal(Person):
     """class Handling cannibals"""
 
+    kind = "c"
+    # where centers of more than three cannibals go on each bank
+    crowd = {"right": (1060, 330, 170, 250), "left": (60, 380, 140, 240)}
+
     def __init__(self, slot):
-        self.imgpath = "images/idle0"
-        self.img = pygame.image.load(self.imgpath + ".png")
-        self.animTick = 0
-        self.state = "idle"
-        self.side = "right"
         self.slot = slot
+        self.person = gameGraph.missionaries + slot
         self.pos = {
             "right": (1050 + 70 * slot, 350 + 115 * slot),
             "left": (180 - 50 * slot, 400 + 100 * slot),
         }
+        if gameGraph.cannibals > 3:
+            self.pos = {
+                side: self.crowdPos(slot, gameGraph.cannibals, area)
+                for side, area in Cannibal.crowd.items()
+            }
+        self.idleSheet = Assets.sheet("idle", 2)
+        self.moveSheet = Assets.sheet("move", 2)
+        self.hoverImg = Assets.get("hovered")
+        self.rect = self.idleSheet[0].get_rect()
+        self.reset()
+
+    def reset(self):
+        """puts cannibal back on the right bank"""
+        self.img = self.idleSheet[0]
+        self.animTick = 0
         self.animCounter = 0
-        self.idleSheet = tuple(
-            pygame.image.load("images/" + "idle" + str(i) + ".png") for i in range(2)
-        )
-        self.moveSheet = tuple(
-            pygame.image.load("images/" + "move" + str(i) + ".png") for i in range(2)
-        )
-        self.rect = self.img.get_rect()
+        self.state = "idle"
         self.rect.center = self.pos["right"]
 
     def anim(self):
@@ -305,99 +386,72 @@ class Cannibal(GameObject):
         if self.state == "idle":
             if self.animTick % Game.frameRate == 0:
                 self.img = self.idleSheet[self.animCounter % len(self.idleSheet)]
-                self.img = self.img.convert_alpha()
                 self.animCounter += 1
         if self.state == "move":
             if self.animTick % (Game.frameRate / 8) == 0:
                 self.img = self.moveSheet[self.animCounter % len(self.moveSheet)]
-                self.img = self.img.convert_alpha()
                 self.animCounter += 1
         if self.state == "hovered":
-            self.img = pygame.image.load("images/hovered.png")
-            self.img = self.img.convert_alpha()
+            self.img = self.hoverImg
             self.state = "idle"
             self.animTick = -1
             self.animCounter = 0
         self.animTick += 1
 
-    def onClick(self):
-        if self.state == "idle" and Raft.state == "idle":
-            if Raft.slot1["person"] == self:
-                Raft.slot1["person"] = None
-                self.moveTo(self.pos[self.side], 1)
-            elif Raft.slot2["person"] == self:
-                Raft.slot2["person"] = None
-                self.moveTo(self.pos[self.side], 1)
-            elif Raft.slot1["person"] is None and self.side == Raft.side:
-                self.moveTo(Raft.slot1["pos"], 1)
-                Raft.slot1["person"] = self
-            elif Raft.slot2["person"] is None and self.side == Raft.side:
-                self.moveTo(Raft.slot2["pos"], 1)
-                Raft.slot2["person"] = self
-
     def onHover(self):
         if self.state == "idle" and Raft.state == "idle":
             self.state = "hovered"
 
 
-class Missionary(GameObject):
+class Missionary(Person):
     """handles missionaries"""
 
+    kind = "m"
+    # where centers of more than three missionaries go on each bank
+    crowd = {"right": (900, 360, 150, 250), "left": (210, 400, 130, 220)}
+
     def __init__(self, slot):
-        self.imgpath = "images/midle0"
-        self.img = pygame.image.load(self.imgpath + ".png")
-        self.animTick = 0
-        self.state = "idle"
-        self.side = "right"
         self.slot = slot
+        self.person = slot
         self.pos = {
             "right": (900 + 50 * slot, 375 + 115 * slot),
             "left": (330 - 50 * slot, 425 + 100 * slot),
         }
+        if gameGraph.missionaries > 3:
+            self.pos = {
+                side: self.crowdPos(slot, gameGraph.missionaries, area)
+                for side, area in Missionary.crowd.items()
+            }
+        self.idleSheet = Assets.sheet("midle", 2)
+        self.moveSheet = Assets.sheet("mmove", 2)
+        self.hoverImg = Assets.get("mhovered")
+        self.rect = self.idleSheet[0].get_rect()
+        self.reset()
+
+    def reset(self):
+        """puts missionary back on the right bank"""
+        self.img = self.idleSheet[0]
+        self.animTick = 0
         self.animCounter = 0
-        self.idleSheet = tuple(
-            pygame.image.load("images/" + "midle" + str(i) + ".png") for i in range(2)
-        )
-        self.moveSheet = tuple(
-            pygame.image.load("images/" + "mmove" + str(i) + ".png") for i in range(2)
-        )
-        self.rect = self.img.get_rect()
+        self.state = "idle"
         self.rect.center = self.pos["right"]
 
     def anim(self):
         if self.state == "idle":
             if self.animTick % Game.frameRate == 0:
                 self.img = self.idleSheet[self.animCounter % len(self.idleSheet)]
-                self.img = self.img.convert_alpha()
                 self.animCounter += 1
         if self.state == "move":
             if self.animTick % (Game.frameRate / 8) == 0:
                 self.img = self.moveSheet[self.animCounter % len(self.moveSheet)]
-                self.img = self.img.convert_alpha()
                 self.animCounter += 1
         if self.state == "hovered":
-            self.img = pygame.image.load("images/mhovered.png")
-            self.img = self.img.convert_alpha()
+            self.img = self.hoverImg
             self.state = "idle"
             self.animTick = -1
             self.animCounter = 0
         self.animTick += 1
 
-    def onClick(self):
-        if self.state == "idle" and Raft.state == "idle":
-            if Raft.slot1["person"] == self:
-                Raft.slot1["person"] = None
-                self.moveTo(self.pos[self.side], 1)
-            elif Raft.slot2["person"] == self:
-                Raft.slot2["person"] = None
-                self.moveTo(self.pos[self.side], 1)
-            elif Raft.slot1["person"] is None and self.side == Raft.side:
-                self.moveTo(Raft.slot1["pos"], 1)
-                Raft.slot1["person"] = self
-            elif Raft.slot2["person"] is None and self.side == Raft.side:
-                self.moveTo(Raft.slot2["pos"], 1)
-                Raft.slot2["person"] = self
-
     def onHover(self):
         if self.state == "idle" and Raft.state == "idle":
             self.state = "hovered"
@@ -406,109 +460,249 @@ class Missionary(GameObject):
 class Game:
     """Handles various game related events"""
 
-    def __init__(self, res):
-        pygame.init()
+    def __init__(
+        self,
+        res,
+        dirtyRects=False,
+        profile=False,
+        vectorMotion=False,
+        pacing=False,
+        layered=False,
+        telemetry=None,
+    ):
+        # only modules the game uses, pygame.init() would start audio too
+        pygame.display.init()
+        pygame.font.init()
         Game.gameObjects = []
         Game.cannibals = []
         Game.missionaries = []
-        Game.asyncTasks = []
-        Game.FontBIG = pygame.font.Font("fonts/font.ttf", 120)
-        Game.Font = pygame.font.Font("fonts/font.ttf", 40)
+        Game.asyncTasks = Scheduler(pygame.time.get_ticks)
+        Game.motion = (
+            MotionSystem(MouseClass.index.moved, MouseClass.index.refresh)
+            if vectorMotion
+            else None
+        )
+        Game.bigFontSize = 120
+        Game.fontSize = 40
         Game.raft = None
+        # True while a game is on screen and not over yet
+        Game.playing = False
+        # rules and state of the game on screen, made on play
+        Game.session = None
+        Hints.reset()
         self.dimSur = None
         self.scr = pygame.display.set_mode(res)
+        # images get loaded a slice a frame while the menu is up
+        self.preloading = True
+        # start times of actions whose latency gets recorded on the next frame
+        self.latency = {}
+        # entities reused by every game, made on first play
+        self.raftPool = None
+        self.cannibalPool = []
+        self.missionaryPool = []
+        self.dirtyRects = DirtyRects(self.scr, Colors.BLACK) if dirtyRects else None
+        # background, world, fade and ui layers
+        self.compositor = Compositor(self.scr, Colors.BLACK, 4) if layered else None
+        self.fade = Fade(self.scr.get_size(), Colors.BLACK, 0, 255)
+        self.backGnd = None
+        self.profiler = FrameProfiler(profile)
+        self.profilerSur = None
+        if profile:
+            atexit.register(self.profiler.export, "profile")
         self.fps = pygame.time.Clock()
+        # first tick starts the timer get_ticks reads
+        self.fps.tick()
         Game.frameRate = 120
+        self.pacer = FramePacer(self.fps, Game.frameRate, pacing)
+        self.recorder = None
+        Transitions.subscribers = []
+        # records of play written into directory telemetry
+        Game.telemetry = None
+        if telemetry != None:
+            Game.telemetry = Telemetry(telemetry)
+            atexit.register(Game.telemetry.close)
+            Transitions.subscribe(Game.logTransition)
+        Transitions.subscribe(self.onTransition)
+        Transitions.subscribe(Hints.onTransition)
+
+    @staticmethod
+    def log(kind, **fields):
+        """telemetry record, does nothing when telemetry is off"""
+        if Game.telemetry != None:
+            Game.telemetry.record(kind, **fields)
+
+    @staticmethod
+    def logTransition(previous, state, move):
+        Game.log(
+            "state",
+            previous=gameGraph.name(previous),
+            state=gameGraph.name(state),
+            move=gameGraph.moveNames[move] if move != None else None,
+        )
+        outcome = gameGraph.outcome(state)
+        if outcome != None:
+            Game.log("outcome", outcome=outcome, state=gameGraph.name(state))
+
+    @staticmethod
+    def state():
+        """graphstate of the session on screen, start while there is none"""
+        if Game.session is None:
+            return gameGraph.start
+        return Game.session.state
+
+    @staticmethod
+    def person(person):
+        """character of a person number of the session"""
+        if person < gameGraph.missionaries:
+            return Game.missionaries[person]
+        return Game.cannibals[person - gameGraph.missionaries]
+
+    @staticmethod
+    def activeTasks():
+        """number of running async tasks, moves included"""
+        moving = len(Game.motion) if Game.motion != None else 0
+        return len(Game.asyncTasks) + moving
 
     def createBackground(self, path):
-        backGnd = GameObject(path)
-        backGnd.rect = pygame.Rect(0, 0, backGnd.rect.width, backGnd.rect.height)
-        Game.gameObjects.append(backGnd)
-        self.backGnd = backGnd
+        if self.backGnd is None:
+            backGnd = GameObject(path)
+            backGnd.rect = pygame.Rect(0, 0, backGnd.rect.width, backGnd.rect.height)
+            self.backGnd = backGnd
+        Game.gameObjects.append(self.backGnd)
 
     def instantiateCandM(self):
         """
-        Instantiates 3 cannibals
-        and 3 missionaries
+        Instantiates as many cannibals
+        and missionaries as gameGraph has
         """
-        m1 = Missionary(0)
-        Game.gameObjects.append(m1)
-        Game.missionaries.append(m1)
-        can1 = Cannibal(0)
-        Game.gameObjects.append(can1)
-        Game.cannibals.append(can1)
-        m2 = Missionary(1)
-        Game.gameObjects.append(m2)
-        Game.missionaries.append(m2)
-        can2 = Cannibal(1)
-        Game.gameObjects.append(can2)
-        Game.cannibals.append(can2)
-        can3 = Cannibal(2)
-        Game.gameObjects.append(can3)
-        Game.cannibals.append(can3)
-        m3 = Missionary(2)
-        Game.gameObjects.append(m3)
-        Game.missionaries.append(m3)
+        for slot in range(max(gameGraph.missionaries, gameGraph.cannibals)):
+            if slot < gameGraph.missionaries:
+                m = Game.pooled(self.missionaryPool, Missionary, slot)
+                Game.gameObjects.append(m)
+                Game.missionaries.append(m)
+                MouseClass.index.insert(m, z=2)
+            if slot < gameGraph.cannibals:
+                can = Game.pooled(self.cannibalPool, Cannibal, slot)
+                Game.gameObjects.append(can)
+                Game.cannibals.append(can)
+                MouseClass.index.insert(can, z=2)
+
+    @staticmethod
+    def pooled(pool, cls, slot):
+        """entity of slot from pool, made on first use and reset after that"""
+        if slot < len(pool):
+            pool[slot].reset()
+        else:
+            pool.append(cls(slot))
+        return pool[slot]
 
     def instantiateRaft(self):
-        raft = Raft()
+        if self.raftPool is None:
+            self.raftPool = Raft()
+        else:
+            self.raftPool.reset()
+        raft = self.raftPool
         Game.gameObjects.append(raft)
+        MouseClass.index.insert(raft, z=1)
         Game.raft = raft
 
-    def update(self):
-        """animates and draws every gameObject"""
-        if self.raft != None:
-            self.raft.anim()
-        for can in Game.cannibals:
-            can.anim()
-        for m in Game.missionaries:
-            m.anim()
+    def update(self, frames=1):
+        """animates every gameObject, frames > 1 catches up on skipped frames"""
+        for _ in range(frames):
+            if self.raft != None:
+                self.raft.anim()
+            for can in Game.cannibals:
+                can.anim()
+            for m in Game.missionaries:
+                m.anim()
+
+    def draw(self, ui):
+        """draws gameObjects and ui, then pushes them to the display"""
+        if self.compositor != None:
+            world = [(obj, obj.img, obj.rect) for obj in Game.gameObjects]
+            background = [item for item in world if item[0] is self.backGnd]
+            world = [item for item in world if item[0] is not self.backGnd]
+            fade = []
+            if self.dimSur != None:
+                fade.append((self.fade, self.dimSur, self.dimSur.get_rect()))
+            ui = [(obj, obj.box, obj.rect) for obj in UI.objs]
+            ui += self.profilerItems()
+            rects = self.compositor.draw([background, world, fade, ui])
+            self.profiler.mark("world")
+            if rects is None:
+                pygame.display.flip()
+            elif rects:
+                pygame.display.update(rects)
+            self.profiler.mark("flip")
+            return
+        if self.dirtyRects != None and self.dimSur is None:
+            items = [(obj, obj.img, obj.rect) for obj in Game.gameObjects]
+            items += [(obj, obj.box, obj.rect) for obj in UI.objs]
+            items += self.profilerItems()
+            rects = self.dirtyRects.draw(items)
+            self.profiler.mark("world")
+            if rects is None:
+                pygame.display.flip()
+            elif rects:
+                pygame.display.update(rects)
+            self.profiler.mark("flip")
+            return
+        if self.dirtyRects != None:
+            # fullscreen effects are drawn the usual way
+            self.dirtyRects.invalidate()
+        self.scr.fill(Colors.BLACK)
         for obj in Game.gameObjects:
             self.scr.blit(obj.img, obj.rect)
         if self.dimSur != None:
             self.scr.blit(self.dimSur, (0, 0))
-        self.fps.tick(Game.frameRate)
+        self.profiler.mark("world")
+        ui.drawUI()
+        self.profiler.mark("ui")
+        for obj, sur, rect in self.profilerItems():
+            self.scr.blit(sur, rect)
+        pygame.display.flip()
+        self.profiler.mark("flip")
+
+    def profilerItems(self):
+        """
+        profiler overlay as (obj, surface, rect) items, none when it's off,
+        so dirty rects and layers clear it when it goes away
+        """
+        if not (self.profiler.enabled and self.profiler.overlay):
+            return []
+        if self.profilerSur is None or self.profiler.count % 30 == 0:
+            lines = self.profiler.lines()
+            font = Assets.font(20)
+            self.profilerSur = pygame.Surface((330, 22 * len(lines) + 8))
+            for i, line in enumerate(lines):
+                text = font.render(line, True, Colors.YELLOW)
+                self.profilerSur.blit(text, (6, 4 + 22 * i))
+        return [(self.profiler, self.profilerSur, self.profilerSur.get_rect())]
 
     def dimScreen(self, time):
         """
         gets called when player lost
         and dims the screen
         """
-        sur = pygame.Surface((1280, 720))
-        Game.asyncTasks.append(
-            {
-                "obj": self,
-                "func": "dim",
-                "args": {
-                    "sur": sur,
-                    "startAlpha": 255,
-                    "endAlpha": 0,
-                    "startTime": pygame.time.get_ticks(),
-                    "duration": time,
-                },
-            }
-        )
+        Game.asyncTasks.tween(time, self.dim, UI.drawEnd)
 
-    def dim(self, args):
+    def dim(self, t):
         """asynchronous dim"""
-        # args = (startPos,endPos,startTime,time)
-        sur = args["sur"]
-        startAlpha = args["startAlpha"]
-        endAlpha = args["endAlpha"]
-        startTime = args["startTime"]
-        time = args["duration"]
-        t = (pygame.time.get_ticks() - startTime) / (1000 * time)
-
-        alpha = startAlpha * t + (1 - t) * endAlpha
-        self.dimSur = sur
-        self.dimSur.set_alpha(alpha)
-        self.dimSur.fill((0, 0, 0))
-
-        if t >= 1:
-            for task in Game.asyncTasks:
-                if task["args"] == args:
-                    UI.drawEnd()
-                    Game.asyncTasks.remove(task)
+        self.fade.at(t)
+        self.dimSur = self.fade.sur
+
+    def onTransition(self, previous, state, move):
+        """records state change and starts loss or win screen"""
+        if self.recorder != None:
+            self.recorder.state(state, Game.asyncTasks.now)
+        if gameGraph.isFailure(state):
+            Game.playing = False
+            self.onLoss()
+            Game.session.reset()
+            Transitions.change(state, Game.session.state)
+        elif gameGraph.isWin(state):
+            Game.playing = False
+            UI.drawWin()
 
     def onLoss(self):
         """handles loss event"""
@@ -545,11 +739,36 @@ class UI:
 
     def __init__(self, scr):
         UI.objs = []
+        UI.pool = {}
+        MouseClass.index.clear()
         self.scr = scr
         self.center = scr.get_rect().center
 
-    def addObject(self, obj):
+    @staticmethod
+    def addObject(obj):
         UI.objs.append(obj)
+        if isinstance(obj, Button):
+            MouseClass.index.insert(obj, z=obj.z)
+
+    @staticmethod
+    def clear():
+        """removes every ui object"""
+        for obj in UI.objs:
+            MouseClass.index.remove(obj)
+        UI.objs = []
+        Hints.field = None
+
+    @staticmethod
+    def pooled(make, *args, **kwargs):
+        """ui object made once for its arguments and reused after that"""
+        key = (make, args, tuple(sorted(kwargs.items())))
+        obj = UI.pool.get(key)
+        if obj is None:
+            obj = make(*args, **kwargs)
+            UI.pool[key] = obj
+        elif isinstance(obj, Button):
+            obj.unHover()
+        return obj
 
     def drawUI(self):
         for obj in UI.objs:
@@ -558,203 +777,296 @@ class UI:
     def createMenu(self):
         x = self.center[0]
         y = self.center[1]
-        UI.objs = []
-        self.addObject(UIField("Missionaries and", (x, y - 200), big=True))
-        self.addObject(UIField("Cannibals", (x, y - 75), big=True))
-        self.addObject(Button("Play", (x, y + 150), ButtonActions.OnPlay))
-        self.addObject(Button("Exit", (x, y + 225), ButtonActions.OnExit))
+        UI.clear()
+        self.addObject(UI.pooled(UIField, "Missionaries and", (x, y - 200), big=True))
+        self.addObject(UI.pooled(UIField, "Cannibals", (x, y - 75), big=True))
+        self.addObject(UI.pooled(Button, "Play", (x, y + 150), ButtonActions.OnPlay))
+        self.addObject(UI.pooled(Button, "Exit", (x, y + 225), ButtonActions.OnExit))
 
     @staticmethod
     def drawEnd():
-        UI.objs = []
-        UI.objs.append((UIField("YOU LOST", (640, 360), big=True)))
+        UI.clear()
+        UI.addObject(UI.pooled(UIField, "YOU LOST", (640, 360), big=True))
         UI.drawAgain()
 
     @staticmethod
     def drawWin():
-        UI.objs.append((UIField("YOU WON", (640, 360), big=True)))
+        UI.addObject(UI.pooled(UIField, "YOU WON", (640, 360), big=True))
         UI.drawAgain()
 
     def createGameUI(self):
-        UI.objs = []
+        UI.clear()
 
     @staticmethod
     def drawAgain():
         """draws again button after 2 seconds"""
-        Game.asyncTasks.append(
-            {"obj": UI, "func": "drawAgainAsync", "args": pygame.time.get_ticks()}
-        )
+        Game.asyncTasks.after(2, UI.drawAgainAsync)
 
     @staticmethod
-    def drawAgainAsync(sTime):
-        if (pygame.time.get_ticks() - sTime) > 2000:
-            UI.objs.append(Button("Again?", (640, 560), ButtonActions.startAgain))
-            for task in Game.asyncTasks:
-                if task["args"] == sTime:
-                    Game.asyncTasks.remove(task)
+    def drawAgainAsync():
+        UI.addObject(UI.pooled(Button, "Again?", (640, 560), ButtonActions.startAgain))
 
 
 class MouseClass:
     """class handling clicks and hovers"""
 
+    # buttons and characters, kept in sync as they move
+    index = SpatialGrid()
+    mousePos = (-1, -1)
+    hovered = None
+    hoverKey = None
+
+    @staticmethod
+    def GetObjAt(mousePos):
+        """topmost character, raft or button under mousePos"""
+        hits = MouseClass.index.query(mousePos)
+        if not gameGraph.isWin(Game.state()):
+            for obj in hits:
+                if not isinstance(obj, Button):
+                    return obj
+        for obj in hits:
+            if isinstance(obj, Button):
+                return obj
+        return None
+
     @staticmethod
     def GetObjClicked(mousePos):
-        clicked = []
-        clickedObj = None
-        one = None
-        for obj in UI.objs:
-            if isinstance(obj, Button) and obj.rect.collidepoint(mousePos):
-                clicked.append(obj)
-        if gameGraph[graphstate] != "WIN":
-            if Game.raft != None and Game.raft.rect.collidepoint(mousePos):
-                clickedObj = Game.raft
-            for i in range(len(Game.cannibals)):
-                if Game.missionaries[i].rect.collidepoint(mousePos):
-                    clickedObj = Game.missionaries[i]
-                if Game.cannibals[i].rect.collidepoint(mousePos):
-                    clickedObj = Game.cannibals[i]
-            if clickedObj != None:
-                clickedObj.onClick()
-                return None
-        if len(clicked) != 0:
-            one = clicked[0]
-            for obj in clicked:
-                if obj.z > one.z:
-                    one = obj
-        return one
+        obj = MouseClass.GetObjAt(mousePos)
+        Game.log("click", pos=mousePos, target=MouseClass.name(obj))
+        if obj != None and not isinstance(obj, Button):
+            obj.onClick()
+            return None
+        return obj
+
+    @staticmethod
+    def name(obj):
+        """name of a clickable object in telemetry, e.g. "c0", "raft" or "Play" """
+        if obj is None:
+            return None
+        if isinstance(obj, Button):
+            return obj.text
+        if isinstance(obj, Raft):
+            return "raft"
+        return obj.kind + str(obj.slot)
 
     @staticmethod
     def GetObjHovered(mousePos):
-        hovered = None
-        for obj in UI.objs:
-            if isinstance(obj, Button):
-                obj.unHover()
-        for obj in UI.objs:
-            if isinstance(obj, Button) and obj.rect.collidepoint(mousePos):
-                hovered = obj
+        """
+        resolves hovered object only when mouse or index changed,
+        keeps hovering the same object otherwise
+        """
+        key = (mousePos, MouseClass.index.version)
+        if key != MouseClass.hoverKey:
+            MouseClass.hoverKey = key
+            hovered = MouseClass.GetObjAt(mousePos)
+            if MouseClass.hovered is not hovered and isinstance(
+                MouseClass.hovered, Button
+            ):
+                MouseClass.hovered.unHover()
+            MouseClass.hovered = hovered
+        if MouseClass.hovered != None:
+            MouseClass.hovered.onHover()
+
+
+class Hints:
+    """shows the best next move and can play the game by itself"""
+
+    solver = None
+    field = None
+    auto = False
 
-        if Game.raft != None and Game.raft.rect.collidepoint(mousePos):
-            hovered = Game.raft
-        for i in range(len(Game.cannibals)):
-            if Game.missionaries[i].rect.collidepoint(mousePos):
-                hovered = Game.missionaries[i]
-            if Game.cannibals[i].rect.collidepoint(mousePos):
-                hovered = Game.cannibals[i]
-        if hovered != None:
-            hovered.onHover()
+    @staticmethod
+    def getSolver():
+        """solver of current gameGraph, built on first use"""
+        if Hints.solver is None or Hints.solver.graph is not gameGraph:
+            Hints.solver = Solver(gameGraph)
+        return Hints.solver
+
+    @staticmethod
+    def reset():
+        Hints.field = None
+        Hints.auto = False
+
+    @staticmethod
+    def toggleHint():
+        if Hints.field not in UI.objs:
+            Hints.field = UIField("Hint:", (640, 50))
+            UI.addObject(Hints.field)
+            Hints.refresh()
+        else:
+            UI.objs.remove(Hints.field)
+            Hints.field = None
+
+    @staticmethod
+    def toggleAuto():
+        Hints.auto = not Hints.auto
+
+    @staticmethod
+    def onTransition(previous, state, move):
+        Hints.refresh()
+
+    @staticmethod
+    def refresh():
+        """shows best move from the current graphstate"""
+        state = Game.state()
+        if Hints.field is None or gameGraph.outcome(state) != None:
+            return
+        move = Hints.getSolver().hint(state)
+        text = "Hint: " + (move if move != None else "none")
+        if text != Hints.field.text:
+            Hints.field.updateText(text)
+
+    @staticmethod
+    def update():
+        """makes next auto solve click, once a frame"""
+        if not Game.playing:
+            return
+        if Hints.auto and Game.activeTasks() == 0 and Raft.state == "idle":
+            Hints.autoClick()
+
+    @staticmethod
+    def autoClick():
+        """clicks one character or the raft towards the best move"""
+        move = Hints.getSolver().bestMove[Game.state()]
+        if move < 0:
+            Hints.auto = False
+            return
+        c, m = gameGraph.moves[move]
+        riders = [person for _, person in Raft.riders()]
+        cannibals = [p for p in riders if isinstance(p, Cannibal)]
+        missionaries = [p for p in riders if isinstance(p, Missionary)]
+        # first get off who shouldn't sail
+        if len(cannibals) > c:
+            cannibals[0].onClick()
+        elif len(missionaries) > m:
+            missionaries[0].onClick()
+        elif len(cannibals) < c:
+            Hints.board(Game.cannibals, riders)
+        elif len(missionaries) < m:
+            Hints.board(Game.missionaries, riders)
+        else:
+            Game.raft.onClick()
+
+    @staticmethod
+    def board(people, riders):
+        for person in people:
+            if person.side == Raft.side() and person not in riders:
+                person.onClick()
+                return
 
 
 def handleInput(ui, game):
     """initializes used buttons"""
     for event in pygame.event.get():
+        game.pacer.onEvent(event)
+        if game.recorder != None:
+            game.recorder.event(event, Game.asyncTasks.now)
         if event.type == pygame.QUIT:
             sys.exit()
         if event.type == pygame.MOUSEBUTTONDOWN:
-            mPos = pygame.mouse.get_pos()
-            temp = MouseClass.GetObjClicked(mPos)
+            temp = MouseClass.GetObjClicked(event.pos)
             if temp != None:
                 temp.onClick(ui, game)
-    MouseClass.GetObjHovered(pygame.mouse.get_pos())
+        if event.type == pygame.MOUSEMOTION:
+            MouseClass.mousePos = event.pos
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            game.profiler.overlay = not game.profiler.overlay
+        if event.type == pygame.KEYDOWN and Game.playing:
+            if event.key == pygame.K_h:
+                Hints.toggleHint()
+            if event.key == pygame.K_a:
+                Hints.toggleAuto()
+    MouseClass.GetObjHovered(MouseClass.mousePos)
 
 
 def handleAsync():
     """iterates over ongoing asynchronous calls"""
-    for task in Game.asyncTasks:
-        func = getattr(task["obj"], task["func"])
-        func(task["args"])
+    Game.asyncTasks.tick()
+    if Game.motion != None:
+        Game.motion.step(Game.asyncTasks.now)
 
 
-async def main():
+def runFrame(ui, game, render=True):
+    """
+    one pass of the main loop, without waiting for the next frame,
+    render=False skips animating and drawing
+    """
+    profiler = game.profiler
+    profiler.begin()
+    handleAsync()
+    profiler.mark("async")
+    Hints.update()
+    profiler.mark("graph")
+    handleInput(ui, game)
+    profiler.mark("input")
+    if render:
+        game.update(game.pacer.frames)
+        profiler.mark("update")
+        game.draw(ui)
+        for name, start in game.latency.items():
+            profiler.milestone(name, (time.perf_counter() - start) * 1000)
+        game.latency.clear()
+        if game.preloading:
+            game.preloading = Assets.preloadStep()
+        profiler.mark("load")
+
+
+async def main(
+    dirtyRects=False,
+    profile=False,
+    vectorMotion=False,
+    pacing=True,
+    record=None,
+    layered=False,
+    telemetry=None,
+):
     """sets up Game object, contains main loop"""
-    game = Game((1280, 720))
+    game = Game(
+        (1280, 720), dirtyRects, profile, vectorMotion, pacing, layered, telemetry
+    )
+    if record != None:
+        game.recorder = Recorder(record, gameGraph)
+        game.recorder.state(Game.state(), 0)
+        atexit.register(game.recorder.close)
     ui = UI(game.scr)
     ui.createMenu()
+    runFrame(ui, game)
+    game.profiler.milestone("coldStart", (time.perf_counter() - startTime) * 1000)
 
     # main loop
     while True:
-        handleAsync()
-        global graphstate
-        if gameGraph[graphstate] == "FAILURE":
-            game.onLoss()
-            graphstate = "-cccmmmb"
-        if gameGraph[graphstate] == "WIN":
-            UI.drawWin()
-        game.scr.fill(Colors.BLACK)
-        handleInput(ui, game)
-        game.update()
-        ui.drawUI()
-        pygame.display.flip()
-        await asyncio.sleep(0)
-
-
-# current state of gamegraph
-graphstate = "-cccmmmb"
-
-FAILURE = "FAILURE"
-WIN = "WIN"
-# logic graph of the game
-gameGraph = {
-    "-cccmmmb": {
-        "c": "bc-ccmmm",
-        "m": "bm-cccmm",
-        "2c": "bcc-cmmm",
-        "2m": "bmm-cccm",
-        "cm": "bcm-ccmm",
-    },
-    "m-cccmmb": FAILURE,
-    "mm-cccmb": FAILURE,
-    "mmm-cccb": {"c": "bcmmm-cc", "2c": "bccmmm-c"},
-    "c-ccmmmb": {
-        "c": "bcc-cmmm",
-        "2c": "bccc-mmm",
-        "m": "bcm-ccmm",
-        "2m": "bcmm-ccm",
-        "cm": "bccm-cmm",
-    },
-    "cc-cmmmb": {"c": "bccc-mmm", "m": "bccm-cmm", "2m": "bccmm-cm", "cm": "bcccm-mm"},
-    "ccc-mmmb": {"m": "bcccm-mm", "2m": "bcccmm-m"},
-    "cm-ccmmb": {
-        "c": "bccm-cmm",
-        "m": "bcmm-ccm",
-        "2c": "bcccm-mm",
-        "2m": "bcmmm-cc",
-        "cm": "bccmm-cm",
-    },
-    "ccm-cmmb": FAILURE,
-    "cccm-mmb": FAILURE,
-    "cmm-ccmb": FAILURE,
-    "ccmm-cmb": {"c": "bcccmm-m", "m": "bccmmm-c", "cm": "bcccmmm-"},
-    "cccmm-mb": FAILURE,
-    "cmmm-ccb": {"c": "bccmmm-c", "2c": "bcccmmm-"},
-    "ccmmm-cb": {"c": "bcccmmm-"},
-    "bm-cccmm": FAILURE,
-    "bmm-cccm": FAILURE,
-    "bmmm-ccc": {"m": "mm-cccmb", "2m": "m-cccmmb"},
-    "bc-ccmmm": {"c": "-cccmmmb"},
-    "bcc-cmmm": {"c": "c-ccmmmb", "2c": "-cccmmmb"},
-    "bccc-mmm": {"c": "cc-cmmmb", "2c": "c-ccmmmb"},
-    "bcm-ccmm": {"c": "m-cccmmb", "m": "c-ccmmmb", "cm": "-cccmmmb"},
-    "bccm-cmm": FAILURE,
-    "bcccm-mm": FAILURE,
-    "bcmm-ccm": FAILURE,
-    "bccmm-cm": {
-        "c": "cmm-ccmb",
-        "m": "ccm-cmmb",
-        "2c": "mm-cccmb",
-        "2m": "cc-cmmmb",
-        "cm": "cm-ccmmb",
-    },
-    "bcccmm-m": FAILURE,
-    "bcmmm-cc": {"c": "mmm-cccb", "m": "cmm-ccmb", "2m": "cm-ccmmb", "cm": "mm-cccmb"},
-    "bccmmm-c": {
-        "c": "cmmm-ccb",
-        "m": "ccbb-cmb",
-        "2c": "mmm-cccb",
-        "2m": "ccm-cmmb",
-        "cm": "cmm-ccmb",
-    },
-    "bcccmmm-": WIN,
-}
+        await game.pacer.wait(Game.activeTasks() > 0 or game.preloading)
+        game.profiler.mark("tick")
+        game.profiler.end(Game.activeTasks())
+        runFrame(ui, game)
+        if game.recorder != None:
+            game.recorder.flush()
+
+
+# logic graph of the game, its solver too when both come from the cache
+gameGraph, Hints.solver = graphcache.cached(missionaries=3, cannibals=3, capacity=2)
 # makes sure that module won't run when imported by another module
-if __name__ == "__main__":
-    asyncio.run(main())
+if __name__ == "__main__" and sys.argv[1:2] == ["sweep"]:
+    import sweep
+
+    sweep.main(sys.argv[2:])
+elif __name__ == "__main__":
+    asyncio.run(
+        main(
+            dirtyRects="--dirty-rects" in sys.argv,
+            profile="--profile" in sys.argv,
+            vectorMotion="--vector-motion" in sys.argv,
+            pacing="--no-pacing" not in sys.argv,
+            layered="--layered" in sys.argv,
+            record=(
+                sys.argv[sys.argv.index("--record") + 1]
+                if "--record" in sys.argv
+                else None
+            ),
+            telemetry=(
+                sys.argv[sys.argv.index("--telemetry") + 1]
+                if "--telemetry" in sys.argv
+                else None
+            ),
+        )
+    )
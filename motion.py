@@ -0,0 +1,157 @@
+import numpy as np
+
+# slots turned into python objects at once by MotionSystem.step()
+CHUNK = 256
+
+
+class MotionSystem:
+    """
+    moves many objects at once, start and end points, start times
+    and durations live in numpy arrays and every running move
+    is advanced in one vectorized step per frame
+    """
+
+    def __init__(self, onMoved=None, onStopped=None, capacity=64):
+        # onMoved(objs) gets called once a step with every obj whose rect
+        # changed, onStopped(objs) with the ones whose move ended
+        self.onMoved = onMoved
+        self.onStopped = onStopped
+        self.objs = []
+        self.onDone = []
+        self.slotOf = {}
+        self.free = []
+        self.start = np.zeros((0, 2))
+        self.end = np.zeros((0, 2))
+        self.startTime = np.zeros(0)
+        self.duration = np.ones(0)
+        self.last = np.zeros((0, 2), dtype=np.int64)
+        self.active = np.zeros(0, dtype=bool)
+        # scratch buffers of step(), same length as the slots
+        self.t = np.zeros(0)
+        self.pos = np.zeros((0, 2))
+        self.center = np.zeros((0, 2), dtype=np.int64)
+        self.differs = np.zeros((0, 2), dtype=bool)
+        self.changed = np.zeros(0, dtype=bool)
+        self.finished = np.zeros(0, dtype=bool)
+        self.grow(capacity)
+
+    def __len__(self):
+        return len(self.slotOf)
+
+    def grow(self, capacity):
+        extra = capacity - len(self.objs)
+        self.objs += [None] * extra
+        self.onDone += [None] * extra
+        self.free += range(capacity - 1, len(self.objs) - extra - 1, -1)
+        self.start = np.concatenate((self.start, np.zeros((extra, 2))))
+        self.end = np.concatenate((self.end, np.zeros((extra, 2))))
+        self.startTime = np.concatenate((self.startTime, np.zeros(extra)))
+        self.duration = np.concatenate((self.duration, np.ones(extra)))
+        self.last = np.concatenate((self.last, np.zeros((extra, 2), np.int64)))
+        self.active = np.concatenate((self.active, np.zeros(extra, dtype=bool)))
+        self.t = np.zeros(capacity)
+        self.pos = np.zeros((capacity, 2))
+        self.center = np.zeros((capacity, 2), dtype=np.int64)
+        self.differs = np.zeros((capacity, 2), dtype=bool)
+        self.changed = np.zeros(capacity, dtype=bool)
+        self.finished = np.zeros(capacity, dtype=bool)
+
+    def move(self, obj, endPos, duration, now, onDone=None):
+        """
+        moves obj's center to endPos in duration seconds,
+        replaces move obj already had without finishing it
+        """
+        self.cancel(obj)
+        if not self.free:
+            self.grow(len(self.objs) * 2)
+        slot = self.free.pop()
+        self.slotOf[id(obj)] = slot
+        self.objs[slot] = obj
+        self.onDone[slot] = onDone
+        self.start[slot] = obj.rect.center
+        self.end[slot] = endPos
+        self.startTime[slot] = now
+        self.duration[slot] = max(duration * 1000, 1)
+        self.last[slot] = obj.rect.center
+        self.active[slot] = True
+
+    def moving(self, obj):
+        return id(obj) in self.slotOf
+
+    def cancel(self, obj):
+        """stops obj where it is, its onDone doesn't get called"""
+        slot = self.slotOf.pop(id(obj), None)
+        if slot is not None:
+            self.release(slot)
+
+    def release(self, slot):
+        self.active[slot] = False
+        self.objs[slot] = None
+        self.onDone[slot] = None
+        self.free.append(slot)
+
+    def clear(self):
+        for slot in self.slotOf.values():
+            self.release(slot)
+        self.slotOf = {}
+
+    def nextDeadline(self):
+        """time the earliest running move ends or None"""
+        if not self.slotOf:
+            return None
+        np.add(self.startTime, self.duration, out=self.t)
+        return float(self.t.min(initial=np.inf, where=self.active))
+
+    def step(self, now):
+        """
+        advances every running move, finished moves call their onDone.
+        Works on every slot with the preallocated buffers, free slots
+        are masked out by active
+        """
+        if not self.slotOf:
+            return
+        t, pos, center, active = self.t, self.pos, self.center, self.active
+        np.subtract(now, self.startTime, out=t)
+        np.divide(t, self.duration, out=t)
+        np.clip(t, 0, 1, out=t)
+        np.subtract(self.end, self.start, out=pos)
+        np.multiply(pos, t[:, None], out=pos)
+        np.add(pos, self.start, out=pos)
+        # truncates like astype() did
+        np.copyto(center, pos, casting="unsafe")
+        np.not_equal(center, self.last, out=self.differs)
+        np.logical_or(self.differs[:, 0], self.differs[:, 1], out=self.changed)
+        np.logical_and(self.changed, active, out=self.changed)
+        np.copyto(self.last, center, where=self.changed[:, None])
+        np.greater_equal(t, 1, out=self.finished)
+        np.logical_and(self.finished, active, out=self.finished)
+
+        changed = np.flatnonzero(self.changed)
+        moved = []
+        # python lists of a chunk at a time keep the garbage per frame small
+        for first in range(0, changed.size, CHUNK):
+            slots = changed[first : first + CHUNK]
+            for slot, xy in zip(slots.tolist(), center[slots].tolist()):
+                obj = self.objs[slot]
+                obj.rect.center = xy
+                moved.append(obj)
+        if moved and self.onMoved is not None:
+            self.onMoved(moved)
+
+        # callbacks run after every position is written
+        finished = np.flatnonzero(self.finished).tolist()
+        if not finished:
+            return
+        stopped = []
+        callbacks = []
+        for slot in finished:
+            obj = self.objs[slot]
+            del self.slotOf[id(obj)]
+            stopped.append(obj)
+            callbacks.append(self.onDone[slot])
+            self.release(slot)
+        if self.onStopped is not None:
+            self.onStopped(stopped)
+        for callback in callbacks:
+            if callback is not None:
+                callback()
@@ -0,0 +1,83 @@
+import asyncio
+import sys
+import time
+import pygame
+
+HIDDEN = (pygame.WINDOWHIDDEN, pygame.WINDOWMINIMIZED)
+SHOWN = (pygame.WINDOWSHOWN, pygame.WINDOWRESTORED)
+
+
+class FramePacer:
+    """
+    decides how long main loop waits for the next frame, full frame rate
+    while something moves or input comes in, low rate when nothing happens
+    and no frames at all while the window or browser tab is hidden
+    """
+
+    def __init__(self, clock, frameRate, enabled=True, idleRate=10, linger=0.25):
+        self.clock = clock
+        self.frameRate = frameRate
+        self.enabled = enabled
+        self.idleRate = idleRate
+        # seconds of full frame rate after last activity
+        self.linger = linger
+        self.lastActive = time.monotonic()
+        self.last = time.monotonic()
+        self.hidden = False
+        self.web = sys.platform == "emscripten"
+        # frames of animation the next update has to catch up on
+        self.frames = 1
+
+    def onEvent(self, event):
+        """gets called with every input event"""
+        self.lastActive = time.monotonic()
+        if event.type in HIDDEN:
+            self.hidden = True
+        elif event.type in SHOWN:
+            self.hidden = False
+
+    def isHidden(self):
+        if self.web:
+            import platform
+
+            return bool(platform.window.document.hidden)
+        return self.hidden
+
+    async def wait(self, active):
+        """waits for the next frame, active tells if anything is animating"""
+        if not self.enabled:
+            self.clock.tick(self.frameRate)
+            await asyncio.sleep(0)
+            return
+        now = time.monotonic()
+        if active:
+            self.lastActive = now
+        if self.isHidden():
+            await self.pause()
+        elif now - self.lastActive < self.linger or pygame.event.peek():
+            self.clock.tick(self.frameRate)
+            await asyncio.sleep(0)
+            self.last = time.monotonic()
+            self.frames = 1
+            return
+        elif self.web:
+            await asyncio.sleep(1 / self.idleRate)
+        else:
+            # sleeps until input comes or idle frame is due
+            event = pygame.event.wait(int(1000 / self.idleRate))
+            if event.type != pygame.NOEVENT:
+                pygame.event.post(event)
+            await asyncio.sleep(0)
+        now = time.monotonic()
+        elapsed = round((now - self.last) * self.frameRate)
+        self.frames = min(max(elapsed, 1), self.frameRate)
+        self.last = now
+        self.clock.tick()
+
+    async def pause(self):
+        """sleeps until the window or tab is visible again"""
+        while self.isHidden():
+            await asyncio.sleep(0.25)
+            if not self.web:
+                for event in pygame.event.get(HIDDEN + SHOWN):
+                    self.onEvent(event)
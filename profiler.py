@@ -0,0 +1,128 @@
+import csv
+import json
+import time
+import numpy as np
+
+# phases of a frame in the order main loop runs them
+PHASES = (
+    "async",
+    "graph",
+    "input",
+    "update",
+    "world",
+    "ui",
+    "flip",
+    "load",
+    "tick",
+)
+
+
+class FrameProfiler:
+    """
+    times every phase of the last frames in a ring buffer,
+    does nothing when disabled so it can stay in the main loop
+    """
+
+    def __init__(self, enabled=False, frames=1000):
+        self.enabled = enabled
+        self.frames = frames
+        self.times = np.zeros((frames, len(PHASES)))
+        self.tasks = np.zeros(frames, dtype=np.int32)
+        self.phaseIndex = {name: i for i, name in enumerate(PHASES)}
+        self.count = 0
+        self.row = None
+        self.last = 0
+        self.overlay = False
+        # one off timings in milliseconds, recorded even when disabled
+        self.milestones = {}
+
+    def begin(self):
+        """starts timing a new frame"""
+        if not self.enabled:
+            return
+        self.row = self.times[self.count % self.frames]
+        self.row[:] = 0
+        self.last = time.perf_counter()
+
+    def mark(self, phase):
+        """closes phase that just finished"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.row[self.phaseIndex[phase]] += (now - self.last) * 1000
+        self.last = now
+
+    def end(self, tasks):
+        """closes frame, tasks is the number of running async tasks"""
+        if not self.enabled:
+            return
+        self.tasks[self.count % self.frames] = tasks
+        self.count += 1
+
+    def milestone(self, name, ms):
+        """records one off timing like cold start"""
+        self.milestones[name] = ms
+
+    def recorded(self):
+        """(phase times, task counts) of stored frames, oldest first"""
+        n = min(self.count, self.frames)
+        start = self.count % self.frames if self.count > self.frames else 0
+        order = (np.arange(n) + start) % self.frames
+        return self.times[order], self.tasks[order]
+
+    def summary(self):
+        """frame time percentiles in milliseconds, without the tick wait"""
+        times, tasks = self.recorded()
+        if len(times) == 0:
+            return {"frames": 0, "milestones": self.milestones}
+        work = times[:, : self.phaseIndex["tick"]].sum(axis=1)
+        p50, p95, p99 = np.percentile(work, (50, 95, 99))
+        return {
+            "frames": len(times),
+            "p50": float(p50),
+            "p95": float(p95),
+            "p99": float(p99),
+            "max": float(work.max()),
+            "phases": {
+                name: float(times[:, i].mean()) for i, name in enumerate(PHASES)
+            },
+            "tasks": {"mean": float(tasks.mean()), "max": int(tasks.max())},
+            "milestones": self.milestones,
+        }
+
+    def lines(self):
+        """text for the on-screen overlay"""
+        s = self.summary()
+        if s["frames"] == 0:
+            return ["no frames"]
+        lines = [
+            "p50 %.2f  p95 %.2f  p99 %.2f ms" % (s["p50"], s["p95"], s["p99"]),
+            "tasks %d" % self.tasks[(self.count - 1) % self.frames],
+        ]
+        lines += ["%s %.2f" % (name, ms) for name, ms in s["phases"].items()]
+        lines += ["%s %.1f ms" % (name, ms) for name, ms in self.milestones.items()]
+        return lines
+
+    def export(self, path):
+        """writes frames to path.csv and summary with frames to path.json"""
+        if not self.enabled:
+            return
+        times, tasks = self.recorded()
+        with open(path + ".csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(("frame",) + PHASES + ("tasks",))
+            first = self.count - len(times)
+            for i in range(len(times)):
+                writer.writerow(
+                    [first + i] + ["%.4f" % ms for ms in times[i]] + [int(tasks[i])]
+                )
+        with open(path + ".json", "w") as f:
+            json.dump(
+                {
+                    "summary": self.summary(),
+                    "phases": PHASES,
+                    "frames": times.round(4).tolist(),
+                    "tasks": tasks.tolist(),
+                },
+                f,
+            )
@@ -0,0 +1,197 @@
+import pygame
+
+
+class DirtyRects:
+    """
+    redraws only the parts of the screen that changed since last frame,
+    items are (obj, surface, rect) triples in drawing order
+    """
+
+    def __init__(self, scr, bgColor):
+        self.scr = scr
+        self.bgColor = bgColor
+        self.area = scr.get_width() * scr.get_height()
+        self.last = {}
+        self.full = True
+
+    def invalidate(self):
+        """forces full redraw on the next frame"""
+        self.full = True
+
+    def changed(self, items):
+        """rects covering everything that moved, appeared, vanished or changed look"""
+        rects = []
+        current = {}
+        for obj, sur, rect in items:
+            prev = self.last.get(id(obj))
+            current[id(obj)] = (obj, sur, rect.copy())
+            if prev is None:
+                rects.append(rect.copy())
+            elif prev[1] is not sur or prev[2] != rect:
+                rects.append(prev[2])
+                rects.append(rect.copy())
+        for key, prev in self.last.items():
+            if key not in current:
+                rects.append(prev[2])
+        self.last = current
+        return merge(rects)
+
+    def draw(self, items):
+        """
+        draws changed regions, returns their rects or
+        None when the whole screen was redrawn
+        """
+        rects = self.changed(items)
+        if self.full:
+            self.full = False
+            rects = None
+        elif sum(r.width * r.height for r in rects) >= self.area:
+            rects = None
+        if rects is None:
+            self.scr.fill(self.bgColor)
+            for obj, sur, rect in items:
+                self.scr.blit(sur, rect)
+            return None
+        for dirty in rects:
+            self.scr.set_clip(dirty)
+            self.scr.fill(self.bgColor, dirty)
+            for obj, sur, rect in items:
+                if rect.colliderect(dirty):
+                    self.scr.blit(sur, rect)
+        self.scr.set_clip(None)
+        return rects
+
+
+class Compositor:
+    """
+    draws the screen from layers of (obj, surface, rect) items, every layer
+    is kept composited over the layers under it and a change in one layer
+    redraws only its region, in that layer and the ones above
+    """
+
+    def __init__(self, scr, bgColor, layers):
+        self.scr = scr
+        self.bgColor = bgColor
+        self.area = scr.get_width() * scr.get_height()
+        self.caches = [pygame.Surface(scr.get_size()).convert() for _ in range(layers)]
+        self.last = [{} for _ in range(layers)]
+        # layers left empty aren't composited, they get rebuilt when used again
+        self.stale = [True] * layers
+        self.full = True
+
+    def invalidate(self):
+        """forces full redraw on the next frame"""
+        self.full = True
+
+    def changed(self, layer, items):
+        """rects of layer's items that moved, appeared, vanished or changed look"""
+        rects = []
+        current = {}
+        last = self.last[layer]
+        for obj, sur, rect in items:
+            key = (sur, sur.get_alpha())
+            prev = last.get(id(obj))
+            current[id(obj)] = (key, rect.copy())
+            if prev is None:
+                rects.append(rect.copy())
+            elif prev[0][0] is not sur or prev[0][1] != key[1] or prev[1] != rect:
+                rects.append(prev[1])
+                rects.append(rect.copy())
+        for key, prev in last.items():
+            if key not in current:
+                rects.append(prev[1])
+        self.last[layer] = current
+        return rects
+
+    def draw(self, layers):
+        """
+        draws changed regions of layers, bottom first, returns their rects
+        or None when the whole screen was redrawn
+        """
+        full = self.full
+        self.full = False
+        rects = []
+        below = None
+        for layer, items in enumerate(layers):
+            wasEmpty = not self.last[layer]
+            changed = self.changed(layer, items)
+            if not full:
+                rects = merge(rects + changed)
+                full = sum(r.width * r.height for r in rects) >= self.area
+            if not items and wasEmpty:
+                self.stale[layer] = True
+                continue
+            cache = self.caches[layer]
+            if full or self.stale[layer]:
+                self.stale[layer] = False
+                self.compose(cache, below, items, cache.get_rect())
+            else:
+                for dirty in rects:
+                    self.compose(cache, below, items, dirty)
+            below = cache
+        if full:
+            if below is None:
+                self.scr.fill(self.bgColor)
+            else:
+                self.scr.blit(below, (0, 0))
+            return None
+        for dirty in rects:
+            if below is None:
+                self.scr.fill(self.bgColor, dirty)
+            else:
+                self.scr.blit(below, dirty, dirty)
+        return rects
+
+    def compose(self, cache, below, items, area):
+        """redraws area of cache from the layer below and items"""
+        cache.set_clip(area)
+        if below is None:
+            cache.fill(self.bgColor, area)
+        else:
+            cache.blit(below, area, area)
+        for obj, sur, rect in items:
+            if rect.colliderect(area):
+                cache.blit(sur, rect)
+        cache.set_clip(None)
+
+
+class Fade:
+    """
+    fullscreen single color surface that is filled once, its alpha
+    follows precomputed steps so most frames of a fade change nothing
+    """
+
+    def __init__(self, size, color, startAlpha, endAlpha, steps=64):
+        self.sur = pygame.Surface(size)
+        self.sur.fill(color)
+        self.alphas = [
+            round(startAlpha + (endAlpha - startAlpha) * i / steps)
+            for i in range(steps + 1)
+        ]
+        self.step = None
+        self.at(0)
+
+    def at(self, t):
+        """sets alpha for fade progress t from 0 to 1"""
+        step = round(min(max(t, 0), 1) * (len(self.alphas) - 1))
+        if step != self.step:
+            self.step = step
+            self.sur.set_alpha(self.alphas[step])
+
+
+def merge(rects):
+    """merges overlapping rects so shared regions are drawn once"""
+    merged = []
+    for rect in rects:
+        if rect.width <= 0 or rect.height <= 0:
+            continue
+        rect = rect.copy()
+        i = 0
+        while i < len(merged):
+            if rect.colliderect(merged[i]):
+                rect.union_ip(merged.pop(i))
+                i = 0
+            else:
+                i += 1
+        merged.append(rect)
+    return merged
@@ -0,0 +1,181 @@
+"""
+recording of input events and their headless replay
+
+    python main.py --record session.mcr
+    python replay.py session.mcr
+"""
+
+import os
+import struct
+import sys
+import time
+import pygame
+from scheduler import Scheduler, VirtualClock
+from stategraph import StateGraph
+
+MAGIC = b"MCRP"
+VERSION = 1
+# magic, version, missionaries, cannibals, capacity
+HEADER = struct.Struct("<4sHIII")
+# kind, time in ms, event type, x, y, button, key or state id
+RECORD = struct.Struct("<BIIhhI")
+EVENT = 0
+STATE = 1
+
+
+class Recorder:
+    """
+    writes every input event handled by the game and every graphstate
+    change with the time of the frame they happened in
+    """
+
+    def __init__(self, path, graph):
+        self.file = open(path, "wb")
+        self.file.write(
+            HEADER.pack(
+                MAGIC, VERSION, graph.missionaries, graph.cannibals, graph.capacity
+            )
+        )
+        self.lastState = None
+
+    def event(self, event, now):
+        x, y = getattr(event, "pos", (0, 0))
+        value = getattr(event, "button", getattr(event, "key", 0))
+        self.file.write(RECORD.pack(EVENT, int(now), event.type, x, y, value))
+
+    def state(self, state, now):
+        if state != self.lastState:
+            self.lastState = state
+            self.file.write(RECORD.pack(STATE, int(now), 0, 0, 0, state))
+
+    def flush(self):
+        """hands what was written to the os, once a frame"""
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class StateLog:
+    """collects graphstate changes during replay, has Recorder's interface"""
+
+    def __init__(self):
+        self.states = []
+
+    def event(self, event, now):
+        pass
+
+    def state(self, state, now):
+        if not self.states or self.states[-1] != state:
+            self.states.append(state)
+
+
+def load(path):
+    """returns (missionaries, cannibals, capacity) and list of records"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise ValueError(path + " is not a recording")
+    magic, version, missionaries, cannibals, capacity = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(path + " is not a recording of version " + str(VERSION))
+    body = memoryview(data)[HEADER.size :]
+    usable = len(body) - len(body) % RECORD.size
+    records = list(RECORD.iter_unpack(body[:usable]))
+    return (missionaries, cannibals, capacity), records
+
+
+def toEvent(record):
+    kind, now, type, x, y, value = record
+    return pygame.event.Event(type, pos=(x, y), button=value, key=value)
+
+
+def eventsByTime(records):
+    """{time: [pygame events]} of the input events in records"""
+    frames = {}
+    for record in records:
+        if record[0] == EVENT:
+            frames.setdefault(record[1], []).append(toEvent(record))
+    return frames
+
+
+def headless(variant):
+    """
+    game of main set up for variant at its menu, timers run on a
+    virtual clock. Returns (main module, game, ui, clock)
+    """
+    import main
+
+    graph = main.gameGraph
+    if (graph.missionaries, graph.cannibals, graph.capacity) != tuple(variant):
+        main.gameGraph = StateGraph(*variant)
+    game = main.Game((1280, 720))
+    clock = VirtualClock()
+    main.Game.asyncTasks = Scheduler(clock)
+    ui = main.UI(game.scr)
+    ui.createMenu()
+    return main, game, ui, clock
+
+
+def replay(path, render=False):
+    """
+    feeds recorded events back through the game on a virtual clock,
+    every animation in between resolves at once. Returns (expected
+    graphstates, replayed graphstates)
+    """
+    variant, records = load(path)
+    main, game, ui, clock = headless(variant)
+    game.recorder = StateLog()
+    game.recorder.state(main.Game.state(), 0)
+
+    def catchUp(until):
+        """
+        runs a frame at every deadline before until, and one more whenever
+        auto solve can make its next click
+        """
+        while True:
+            if main.Hints.auto and main.Game.playing and main.Game.activeTasks() == 0:
+                main.runFrame(ui, game, render)
+                if main.Game.activeTasks() == 0:
+                    # auto solve found nothing to click
+                    return
+                continue
+            deadlines = [main.Game.asyncTasks.nextDeadline()]
+            if main.Game.motion != None:
+                deadlines.append(main.Game.motion.nextDeadline())
+            deadlines = [d for d in deadlines if d is not None and d < until]
+            if not deadlines:
+                return
+            clock.now = max(min(deadlines), clock.now)
+            main.runFrame(ui, game, render)
+
+    expected = [r[5] for r in records if r[0] == STATE]
+    frames = eventsByTime(records)
+    for now in sorted(frames):
+        events = frames[now]
+        catchUp(now)
+        clock.now = now
+        pygame.event.clear()
+        for event in events:
+            if event.type == pygame.QUIT:
+                return expected, game.recorder.states
+            pygame.event.post(event)
+        main.runFrame(ui, game, render)
+    if records:
+        catchUp(max(r[1] for r in records) + 1)
+    return expected, game.recorder.states
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    start = time.perf_counter()
+    expected, replayed = replay(sys.argv[1])
+    elapsed = time.perf_counter() - start
+    print("replayed %d state changes in %.1f ms" % (len(replayed), elapsed * 1000))
+    if expected != replayed:
+        print("graphstate sequence differs from recording")
+        print("recorded:", expected)
+        print("replayed:", replayed)
+        sys.exit(1)
+    print("graphstate sequence matches recording")
@@ -0,0 +1,131 @@
+import heapq
+import itertools
+
+
+class Task:
+    """handle of a scheduled timer or tween"""
+
+    def __init__(self, scheduler, order, start, duration, onUpdate, onDone):
+        self.scheduler = scheduler
+        self.order = order
+        self.start = start
+        self.length = max(duration * 1000, 1)
+        self.deadline = start + duration * 1000
+        self.onUpdate = onUpdate
+        self.onDone = onDone
+        self.done = False
+        self.cancelled = False
+
+    @property
+    def active(self):
+        return not (self.done or self.cancelled)
+
+    def cancel(self):
+        self.scheduler.cancel(self)
+
+
+class Scheduler:
+    """
+    runs timers and tweens, finished tasks are found with a heap
+    ordered by deadline, tasks can be added or cancelled during a tick
+    """
+
+    def __init__(self, clock):
+        # clock returns current time in milliseconds
+        self.clock = clock
+        self.now = clock()
+        self.heap = []
+        self.tweens = {}
+        self.counter = itertools.count()
+        self.count = 0
+        # deadline of the task whose callbacks are running
+        self.firing = None
+
+    def __len__(self):
+        return self.count
+
+    def time(self):
+        """
+        start time for new tasks, tasks started from callbacks of a
+        finishing task start at its deadline, others at the time of the
+        last tick, so timing doesn't depend on when frames happen or how
+        long handling input took
+        """
+        return self.firing if self.firing is not None else self.now
+
+    def add(self, duration, onUpdate=None, onDone=None):
+        """schedules task ending after duration seconds"""
+        order = next(self.counter)
+        task = Task(self, order, self.time(), duration, onUpdate, onDone)
+        heapq.heappush(self.heap, (task.deadline, order, task))
+        if onUpdate is not None:
+            self.tweens[order] = task
+        self.count += 1
+        return task
+
+    def tween(self, duration, onUpdate, onDone=None):
+        """calls onUpdate(t) every tick with t going from 0 to 1, then onDone()"""
+        return self.add(duration, onUpdate, onDone)
+
+    def after(self, delay, callback):
+        """calls callback once after delay seconds"""
+        return self.add(delay, None, callback)
+
+    def cancel(self, task):
+        if not task.active:
+            return
+        task.cancelled = True
+        self.tweens.pop(task.order, None)
+        self.count -= 1
+
+    def clear(self):
+        """cancels every task"""
+        for _, _, task in self.heap:
+            task.cancelled = True
+        self.heap = []
+        self.tweens = {}
+        self.count = 0
+
+    def nextDeadline(self):
+        """deadline of the earliest pending task or None"""
+        while self.heap and not self.heap[0][2].active:
+            heapq.heappop(self.heap)
+        return self.heap[0][0] if self.heap else None
+
+    def tick(self):
+        """updates running tweens and finishes every task past its deadline"""
+        self.now = self.clock()
+        # tweens added during this tick start updating on the next one
+        for task in list(self.tweens.values()):
+            if task.active and task.deadline > self.now:
+                task.onUpdate((self.now - task.start) / task.length)
+        while self.heap and self.heap[0][0] <= self.now:
+            _, _, task = heapq.heappop(self.heap)
+            if task.active:
+                self.finish(task)
+
+    def finish(self, task):
+        task.done = True
+        self.tweens.pop(task.order, None)
+        self.count -= 1
+        self.firing = task.deadline
+        try:
+            if task.onUpdate is not None:
+                task.onUpdate(1)
+            if task.onDone is not None:
+                task.onDone()
+        finally:
+            self.firing = None
+
+
+class VirtualClock:
+    """clock moved forward by hand, for headless runs"""
+
+    def __init__(self, now=0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, ms):
+        self.now += ms
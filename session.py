@@ -0,0 +1,305 @@
+"""
+headless game sessions, each one owns the whole state of a game so
+one process can run thousands of them next to each other. The game
+in main.py plays through one too, its sprites only animate the rules
+
+    python session.py --sessions 10000
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+import tracemalloc
+from scheduler import Scheduler, VirtualClock
+import graphcache
+from stategraph import WIN, moveName
+
+LEFT = 0
+RIGHT = 1
+# seconds, same as the animations of the game
+BOARDTIME = 1
+CROSSTIME = 3
+
+
+class GameSession:
+    """
+    rules of the game without any drawing: people board and leave the
+    raft on its side, the raft crosses with at least one rider and the
+    graphstate changes when it arrives. People are numbered, missionaries
+    first. Timers run on scheduler, a session made without one gets its
+    own virtual clock moved by tick()
+    """
+
+    __slots__ = (
+        "graph",
+        "scheduler",
+        "clock",
+        "sessionId",
+        "kinds",
+        "sides",
+        "busy",
+        "slots",
+        "raftSide",
+        "crossing",
+        "state",
+        "outcome",
+        "crossings",
+        "onArrive",
+        "generation",
+    )
+
+    def __init__(self, graph, scheduler=None, sessionId=None):
+        self.graph = graph
+        self.clock = None
+        if scheduler is None:
+            self.clock = VirtualClock()
+            scheduler = Scheduler(self.clock)
+        self.scheduler = scheduler
+        self.sessionId = sessionId
+        self.kinds = "m" * graph.missionaries + "c" * graph.cannibals
+        # onArrive(session) gets called after every crossing
+        self.onArrive = None
+        self.generation = 0
+        self.reset()
+
+    def reset(self):
+        """puts everyone back on the starting bank, pending timers are dropped"""
+        self.generation += 1
+        self.sides = bytearray([RIGHT]) * len(self.kinds)
+        self.busy = bytearray(len(self.kinds))
+        self.slots = [None] * self.graph.capacity
+        self.raftSide = RIGHT
+        self.crossing = False
+        self.state = self.graph.start
+        self.outcome = None
+        self.crossings = 0
+
+    def idle(self):
+        """True when nothing moves and the game isn't over"""
+        return not self.crossing and self.outcome is None
+
+    def later(self, delay, callback):
+        """runs callback after delay seconds unless session was reset"""
+        generation = self.generation
+
+        def fire():
+            if generation == self.generation:
+                callback()
+
+        self.scheduler.after(delay, fire)
+
+    def riders(self):
+        return [p for p in self.slots if p is not None]
+
+    def click(self, person):
+        """
+        boards person or takes them off the raft,
+        returns False when the click does nothing
+        """
+        if not self.toggle(person):
+            return False
+        self.later(BOARDTIME, lambda: self.boarded((person,)))
+        return True
+
+    def toggle(self, person):
+        """click without the timer, person stays busy until boarded()"""
+        if not self.idle() or self.busy[person]:
+            return False
+        if person in self.slots:
+            self.slots[self.slots.index(person)] = None
+        elif None in self.slots and self.sides[person] == self.raftSide:
+            self.slots[self.slots.index(None)] = person
+        else:
+            return False
+        self.busy[person] = True
+        return True
+
+    def boarded(self, people, depart=False):
+        for person in people:
+            self.busy[person] = False
+        if depart:
+            self.depart()
+
+    def depart(self):
+        """sends the raft across, returns False when it can't go"""
+        if not self.launch():
+            return False
+        self.later(CROSSTIME, self.arrive)
+        return True
+
+    def launch(self):
+        """depart without the timer, the raft crosses until arrive()"""
+        riders = self.riders()
+        if not self.idle() or not riders or any(self.busy[p] for p in riders):
+            return False
+        self.crossing = True
+        return True
+
+    def arrive(self):
+        """lands the raft and its riders on the other side, returns the move id"""
+        riders = self.riders()
+        self.raftSide = LEFT if self.raftSide == RIGHT else RIGHT
+        for person in riders:
+            self.sides[person] = self.raftSide
+        c = sum(self.kinds[p] == "c" for p in riders)
+        move = self.graph.moveId[moveName(c, len(riders) - c)]
+        self.state = self.graph.step(self.state, move)
+        self.crossing = False
+        self.crossings += 1
+        self.outcome = self.graph.outcome(self.state)
+        if self.onArrive is not None:
+            self.onArrive(self)
+        return move
+
+    def play(self, move):
+        """
+        clicks people on and off the raft until it carries move name and
+        departs once they sit, riders that fit the move stay aboard.
+        Raises ValueError when the move isn't allowed now
+        """
+        moveId = self.graph.moveId.get(move)
+        if moveId is None or not self.idle():
+            raise ValueError("move " + str(move) + " not possible now")
+        if self.graph.table[self.state, moveId] < 0:
+            raise ValueError(
+                "move " + move + " not possible in " + self.graph.name(self.state)
+            )
+        if any(self.busy):
+            raise ValueError("move " + move + " waits for people still moving")
+        need = dict(zip("cm", self.graph.moves[moveId]))
+        moved = []
+        for person in self.riders():
+            if need[self.kinds[person]] > 0:
+                need[self.kinds[person]] -= 1
+            elif self.toggle(person):
+                moved.append(person)
+        for person in range(len(self.kinds)):
+            kind = self.kinds[person]
+            if need[kind] > 0 and self.sides[person] == self.raftSide:
+                if person not in self.slots and self.toggle(person):
+                    need[kind] -= 1
+                    moved.append(person)
+        # one timer for everyone who moved, the raft leaves when they sit
+        self.later(BOARDTIME, lambda: self.boarded(moved, True))
+
+    def tick(self, ms):
+        """moves own clock forward by ms and runs timers that are due"""
+        self.clock.advance(ms)
+        self.scheduler.tick()
+
+
+class SessionHost:
+    """
+    runs many sessions on one shared scheduler, an asyncio task sleeps
+    until the earliest timer of any session so idle sessions cost nothing
+    """
+
+    def __init__(self, graph, clock=None):
+        self.graph = graph
+        self.clock = clock if clock is not None else self.realTime
+        self.scheduler = Scheduler(self.clock)
+        self.sessions = {}
+        self.ids = itertools.count(1)
+        self.wake = asyncio.Event()
+
+    @staticmethod
+    def realTime():
+        return time.monotonic() * 1000
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def create(self):
+        session = GameSession(self.graph, self.scheduler, next(self.ids))
+        self.sessions[session.sessionId] = session
+        return session
+
+    def close(self, sessionId):
+        """drops session and its pending timers"""
+        self.sessions.pop(sessionId).reset()
+
+    def click(self, sessionId, person):
+        accepted = self.sessions[sessionId].click(person)
+        self.wake.set()
+        return accepted
+
+    def depart(self, sessionId):
+        accepted = self.sessions[sessionId].depart()
+        self.wake.set()
+        return accepted
+
+    def play(self, sessionId, move):
+        self.sessions[sessionId].play(move)
+        self.wake.set()
+
+    def tick(self):
+        """runs every timer that is due, returns the next deadline or None"""
+        self.scheduler.tick()
+        return self.scheduler.nextDeadline()
+
+    async def run(self):
+        """serves the sessions until cancelled"""
+        while True:
+            deadline = self.tick()
+            self.wake.clear()
+            timeout = None
+            if deadline is not None:
+                timeout = max(deadline - self.clock(), 0) / 1000
+            try:
+                await asyncio.wait_for(self.wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def runVirtual(self):
+        """
+        for a VirtualClock, jumps from deadline to deadline until no timer
+        is left, returns number of ticks
+        """
+        ticks = 0
+        deadline = self.tick()
+        while deadline is not None:
+            self.clock.now = max(self.clock.now, deadline)
+            deadline = self.tick()
+            ticks += 1
+        return ticks
+
+
+def solverPlayer(solver):
+    """onArrive callback that keeps playing the best move"""
+
+    def onArrive(session):
+        if session.outcome is None:
+            session.play(solver.hint(session.state))
+
+    return onArrive
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--missionaries", type=int, default=3)
+    parser.add_argument("--cannibals", type=int, default=3)
+    parser.add_argument("--capacity", type=int, default=2)
+    args = parser.parse_args()
+    graph, solver = graphcache.load(args.missionaries, args.cannibals, args.capacity)
+    if not solver.solvable():
+        parser.error("variant can't be solved")
+    host = SessionHost(graph, VirtualClock())
+    player = solverPlayer(solver)
+
+    tracemalloc.start()
+    for _ in range(args.sessions):
+        session = host.create()
+        session.onArrive = player
+        session.play(solver.hint(session.state))
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    ticks = host.runVirtual()
+    elapsed = time.perf_counter() - start
+    won = sum(s.outcome == WIN for s in host.sessions.values())
+    print(
+        "%d sessions, %d won in %d ticks, %.2f s, %.0f bytes per session"
+        % (len(host), won, ticks, elapsed, memory / len(host))
+    )
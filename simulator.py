@@ -0,0 +1,87 @@
+import numpy as np
+from stategraph import StateGraph
+
+NONE = -1
+
+
+class BatchResult:
+    """outcome of a batch of simulated games, -1 in a step array means never"""
+
+    def __init__(self, finalStates, failureStep, winStep, invalidStep):
+        self.finalStates = finalStates
+        self.failureStep = failureStep
+        self.winStep = winStep
+        self.invalidStep = invalidStep
+
+    @property
+    def failed(self):
+        return self.failureStep != NONE
+
+    @property
+    def won(self):
+        return self.winStep != NONE
+
+    @property
+    def invalid(self):
+        return self.invalidStep != NONE
+
+
+def encodeMoves(sequences, graph):
+    """
+    turns lists of move names ("c", "2m", "cm"...) into
+    a (games, longest sequence) array of move ids padded with -1
+    """
+    moveId = graph.moveId
+    length = max((len(seq) for seq in sequences), default=0)
+    moves = np.full((len(sequences), length), NONE, dtype=np.int32)
+    for i, seq in enumerate(sequences):
+        try:
+            moves[i, : len(seq)] = [moveId[name] for name in seq]
+        except KeyError as e:
+            raise ValueError("unknown move " + str(e) + " in game " + str(i))
+    return moves
+
+
+def simulate(sequences, graph=None, start=None):
+    """
+    plays a batch of games headlessly over the graph's transition table
+
+    sequences is either a list of move name lists or an already
+    encoded array from encodeMoves. Every game stops at its first
+    FAILURE or WIN, at a move that isn't possible, or when its moves run out
+    """
+    graph = graph if graph is not None else StateGraph()
+    if isinstance(sequences, np.ndarray):
+        moves = sequences
+    else:
+        moves = encodeMoves(sequences, graph)
+    games = moves.shape[0]
+
+    states = np.full(games, graph.start if start is None else start, graph.table.dtype)
+    failureStep = np.full(games, NONE, dtype=np.int32)
+    winStep = np.full(games, NONE, dtype=np.int32)
+    invalidStep = np.full(games, NONE, dtype=np.int32)
+
+    # indices of games that are still being played
+    live = np.flatnonzero(~graph.terminal[states])
+    for step in range(moves.shape[1]):
+        if live.size == 0:
+            break
+        move = moves[live, step]
+        live = live[move != NONE]
+        move = move[move != NONE]
+
+        target = graph.table[states[live], move]
+        bad = target < 0
+        invalidStep[live[bad]] = step
+        live = live[~bad]
+        target = target[~bad]
+        states[live] = target
+
+        lost = graph.failure[target]
+        won = target == graph.win
+        failureStep[live[lost]] = step
+        winStep[live[won]] = step
+        live = live[~(lost | won)]
+
+    return BatchResult(states, failureStep, winStep, invalidStep)
@@ -0,0 +1,73 @@
+import numpy as np
+
+
+class Solver:
+    """
+    distance to WIN and the best move of every state of a StateGraph,
+    computed with one breadth first search from WIN over reversed edges.
+    -1 marks states WIN can't be reached from
+    """
+
+    def __init__(self, graph, tables=None):
+        # tables=(distance, bestMove) skips solving, e.g. for cached arrays
+        self.graph = graph
+        if tables is not None:
+            self.distance, self.bestMove = tables
+            return
+        self.distance = np.full(graph.size, -1, dtype=np.int32)
+        self.bestMove = np.full(graph.size, -1, dtype=np.int32)
+        self.solve()
+
+    def reverseEdges(self):
+        """sources and moves of all edges grouped by target, with group offsets"""
+        size, moves = self.graph.table.shape
+        targets = self.graph.table.ravel()
+        edges = np.flatnonzero(targets >= 0)
+        order = np.argsort(targets[edges], kind="stable")
+        edges = edges[order]
+        offsets = np.searchsorted(targets[edges], np.arange(size + 1))
+        return edges // moves, edges % moves, offsets
+
+    def solve(self):
+        sources, moves, offsets = self.reverseEdges()
+        frontier = np.array([self.graph.win])
+        self.distance[self.graph.win] = 0
+        level = 0
+        while frontier.size:
+            level += 1
+            starts = offsets[frontier]
+            counts = offsets[frontier + 1] - starts
+            total = counts.sum()
+            if total == 0:
+                break
+            # positions of every edge leading into the frontier
+            firsts = np.repeat(starts - np.cumsum(counts) + counts, counts)
+            edges = firsts + np.arange(total)
+            prev = sources[edges]
+            new = self.distance[prev] < 0
+            prev, move = prev[new], moves[edges][new]
+            prev, first = np.unique(prev, return_index=True)
+            self.distance[prev] = level
+            self.bestMove[prev] = move[first]
+            frontier = prev
+
+    def solvable(self, state=None):
+        state = self.graph.start if state is None else state
+        return self.distance[state] >= 0
+
+    def hint(self, state):
+        """name of the best move from state or None"""
+        move = self.bestMove[state]
+        return self.graph.moveNames[move] if move >= 0 else None
+
+    def path(self, state=None):
+        """optimal list of move names from state to WIN"""
+        state = self.graph.start if state is None else state
+        if not self.solvable(state):
+            return None
+        moves = []
+        while not self.graph.isWin(state):
+            move = int(self.bestMove[state])
+            moves.append(self.graph.moveNames[move])
+            state = self.graph.step(state, move)
+        return moves
@@ -0,0 +1,110 @@
+import itertools
+
+
+class SpatialGrid:
+    """
+    uniform grid over object rects for point hit tests,
+    objects have to be updated after their rect changes. Objects moving
+    every frame can be marked with moved() instead, they are updated
+    all at once by the next query
+    """
+
+    def __init__(self, cellSize=128):
+        self.cellSize = cellSize
+        self.cells = {}
+        # id(obj): [obj, rect, cells, z, order]
+        self.entries = {}
+        self.counter = itertools.count()
+        # bumped on every change, lets users know cached hits went stale
+        self.version = 0
+        # id(obj): obj of objects marked by moved() since the last sync()
+        self.stale = {}
+
+    def cellsOf(self, rect):
+        size = self.cellSize
+        return [
+            (x, y)
+            for x in range(rect.left // size, (rect.right - 1) // size + 1)
+            for y in range(rect.top // size, (rect.bottom - 1) // size + 1)
+        ]
+
+    def insert(self, obj, z=0):
+        """adds obj, objects inserted later are on top of ones with same z"""
+        if id(obj) in self.entries:
+            self.remove(obj)
+        self.stale.pop(id(obj), None)
+        rect = obj.rect.copy()
+        cells = self.cellsOf(rect)
+        for cell in cells:
+            self.cells.setdefault(cell, set()).add(id(obj))
+        self.entries[id(obj)] = [obj, rect, cells, z, next(self.counter)]
+        self.version += 1
+
+    def remove(self, obj):
+        self.stale.pop(id(obj), None)
+        entry = self.entries.pop(id(obj), None)
+        if entry is None:
+            return
+        for cell in entry[2]:
+            keys = self.cells[cell]
+            keys.discard(id(obj))
+            if not keys:
+                del self.cells[cell]
+        self.version += 1
+
+    def update(self, obj):
+        """moves obj to its current rect"""
+        entry = self.entries.get(id(obj))
+        if entry is None or entry[1] == obj.rect:
+            return
+        cells = self.cellsOf(obj.rect)
+        if cells != entry[2]:
+            for cell in entry[2]:
+                keys = self.cells[cell]
+                keys.discard(id(obj))
+                if not keys:
+                    del self.cells[cell]
+            for cell in cells:
+                self.cells.setdefault(cell, set()).add(id(obj))
+            entry[2] = cells
+        entry[1] = obj.rect.copy()
+        self.version += 1
+
+    def moved(self, objs):
+        """
+        marks objs as moved without updating them yet, version stays
+        the same until sync() brings them up to date
+        """
+        for obj in objs:
+            self.stale[id(obj)] = obj
+
+    def refresh(self, objs):
+        """updates objs and everything marked as moved, e.g. objs stopped"""
+        self.moved(objs)
+        self.sync()
+
+    def sync(self):
+        """updates every object marked by moved()"""
+        stale = self.stale
+        if stale:
+            self.stale = {}
+            for obj in stale.values():
+                self.update(obj)
+
+    def clear(self):
+        self.cells = {}
+        self.entries = {}
+        self.stale = {}
+        self.version += 1
+
+    def query(self, pos):
+        """objects under pos, topmost first"""
+        self.sync()
+        cell = (int(pos[0]) // self.cellSize, int(pos[1]) // self.cellSize)
+        hits = [
+            self.entries[key]
+            for key in self.cells.get(cell, ())
+            if self.entries[key][1].collidepoint(pos)
+        ]
+        hits.sort(key=lambda entry: (entry[3], entry[4]), reverse=True)
+        return [entry[0] for entry in hits]
@@ -0,0 +1,246 @@
+import re
+import numpy as np
+
+FAILURE = "FAILURE"
+WIN = "WIN"
+
+
+def moveName(c, m):
+    """name of a move carrying c cannibals and m missionaries, e.g. "2c", "cm" """
+    name = ""
+    if c > 0:
+        name += ("" if c == 1 else str(c)) + "c"
+    if m > 0:
+        name += ("" if m == 1 else str(m)) + "m"
+    return name
+
+
+def parseMove(name):
+    """returns (cannibals, missionaries) of a move name, inverse of moveName()"""
+    match = re.fullmatch(r"(?:(\d*)c)?(?:(\d*)m)?", name)
+    if not name or match is None:
+        raise ValueError("invalid move name " + repr(name))
+    c, m = match.groups()
+    c = 0 if c is None else int(c or 1)
+    m = 0 if m is None else int(m or 1)
+    if c + m == 0:
+        raise ValueError("invalid move name " + repr(name))
+    return c, m
+
+
+def validate(graph):
+    """
+    problems of a string keyed graph laid out like StateGraph.asDict(),
+    e.g. targets that aren't states, empty list when there are none
+    """
+    problems = []
+    for name, edges in graph.items():
+        if not re.fullmatch(r"b?[cm]*-[cm]*b?", name) or name.count("b") != 1:
+            problems.append("malformed state name " + repr(name))
+        if edges in (FAILURE, WIN):
+            continue
+        if not isinstance(edges, dict):
+            problems.append(name + " has no moves and isn't FAILURE or WIN")
+            continue
+        for move, target in edges.items():
+            try:
+                parseMove(move)
+            except ValueError as e:
+                problems.append(name + ": " + str(e))
+            if target not in graph:
+                problems.append(
+                    name + " " + move + " -> " + repr(target) + " isn't a state"
+                )
+    return problems
+
+
+class StateGraph:
+    """
+    logic graph of the game generated from its parameters
+
+    every state is packed into an integer:
+    id = (missionariesLeft * (cannibals + 1) + cannibalsLeft) * 2 + boatLeft
+    transitions are kept in a dense table indexed by (state id, move id),
+    -1 marks a move that can't be made from the state
+    """
+
+    def __init__(self, missionaries=3, cannibals=3, capacity=2, tables=None):
+        # tables=(failure, terminal, table) skips build, e.g. for cached arrays
+        if missionaries < 0 or cannibals < 0 or capacity < 1:
+            raise ValueError("invalid puzzle parameters")
+        self.missionaries = missionaries
+        self.cannibals = cannibals
+        self.capacity = capacity
+        self.size = (missionaries + 1) * (cannibals + 1) * 2
+        self.moves = tuple(
+            (c, total - c)
+            for total in range(1, capacity + 1)
+            for c in range(total, -1, -1)
+            if c <= cannibals and total - c <= missionaries
+        )
+        self.moveNames = tuple(moveName(c, m) for c, m in self.moves)
+        self.moveId = {name: i for i, name in enumerate(self.moveNames)}
+        self.start = self.pack(0, 0, False)
+        self.win = self.pack(missionaries, cannibals, True)
+        if tables is None:
+            self.build()
+        else:
+            self.failure, self.terminal, self.table = tables
+
+    @classmethod
+    def fromDict(cls, graph, capacity=None):
+        """
+        compiles a hand written string keyed graph into the integer table,
+        only the edges it lists are in the table, -1 everywhere else.
+        Raises ValueError listing dangling targets, malformed names and
+        every edge or outcome that breaks the rules. capacity is taken
+        from the biggest move when it's not given
+        """
+        problems = validate(graph) if graph else ["graph has no states"]
+        if not problems and capacity is None:
+            moves = [
+                parseMove(m) for e in graph.values() if isinstance(e, dict) for m in e
+            ]
+            if moves:
+                capacity = max(sum(m) for m in moves)
+            else:
+                problems.append("graph has no moves, capacity has to be given")
+        if not problems:
+            names = list(graph)
+            missionaries = max(n.count("m") for n in names)
+            cannibals = max(n.count("c") for n in names)
+            compiled = cls(missionaries, cannibals, capacity)
+            if compiled.name(compiled.start) not in graph:
+                problems.append(
+                    "start state " + compiled.name(compiled.start) + " is missing"
+                )
+            table = np.full_like(compiled.table, -1)
+            for name, edges in graph.items():
+                if name.count("m") != missionaries or name.count("c") != cannibals:
+                    problems.append(name + " doesn't have everyone in it")
+                    continue
+                state = compiled.parse(name)
+                if isinstance(edges, str):
+                    if compiled.outcome(state) != edges:
+                        problems.append(name + " isn't " + edges)
+                    continue
+                for move, target in edges.items():
+                    moveId = compiled.moveId.get(move)
+                    if moveId is None or compiled.table[state, moveId] < 0:
+                        problems.append(name + " can't make move " + move)
+                        continue
+                    reached = compiled.name(compiled.table[state, moveId])
+                    if reached != target:
+                        problems.append(
+                            "%s %s leads to %s, not %s" % (name, move, reached, target)
+                        )
+                    table[state, moveId] = compiled.table[state, moveId]
+        if problems:
+            raise ValueError("invalid graph:\n  " + "\n  ".join(problems))
+        compiled.table = table
+        return compiled
+
+    def build(self):
+        """computes failure flags and the transition table for every state"""
+        dtype = np.int32 if self.size < 2**31 else np.int64
+        ids = np.arange(self.size, dtype=dtype)
+        boatLeft = ids & 1
+        cLeft = (ids >> 1) % (self.cannibals + 1)
+        mLeft = (ids >> 1) // (self.cannibals + 1)
+        cRight = self.cannibals - cLeft
+        mRight = self.missionaries - mLeft
+
+        # missionaries get eaten when outnumbered on either bank
+        self.failure = ((mLeft > 0) & (cLeft > mLeft)) | (
+            (mRight > 0) & (cRight > mRight)
+        )
+        self.terminal = self.failure.copy()
+        self.terminal[self.win] = True
+
+        onBoatSide = boatLeft.astype(bool)
+        srcC = np.where(onBoatSide, cLeft, cRight)
+        srcM = np.where(onBoatSide, mLeft, mRight)
+        # people leave the left bank when the boat is there, arrive otherwise
+        sign = np.where(onBoatSide, -1, 1).astype(dtype)
+        flip = (1 - 2 * boatLeft).astype(dtype)
+
+        self.table = np.full((self.size, len(self.moves)), -1, dtype=dtype)
+        for j, (c, m) in enumerate(self.moves):
+            ok = (srcC >= c) & (srcM >= m) & ~self.terminal
+            target = ids + sign * (2 * (m * (self.cannibals + 1) + c)) + flip
+            self.table[:, j] = np.where(ok, target, -1)
+
+    def pack(self, mLeft, cLeft, boatLeft):
+        """packs counts on the left bank and the boat side into a state id"""
+        return (mLeft * (self.cannibals + 1) + cLeft) * 2 + int(boatLeft)
+
+    def unpack(self, state):
+        """returns (missionariesLeft, cannibalsLeft, boatLeft) of a state id"""
+        mLeft, cLeft = divmod(state >> 1, self.cannibals + 1)
+        return mLeft, cLeft, bool(state & 1)
+
+    def step(self, state, move):
+        """returns state reached after making the move (id or name)"""
+        if isinstance(move, str):
+            move = self.moveId[move]
+        target = int(self.table[state, move])
+        if target < 0:
+            raise ValueError(
+                "move " + self.moveNames[move] + " not possible in " + self.name(state)
+            )
+        return target
+
+    def isFailure(self, state):
+        return bool(self.failure[state])
+
+    def isWin(self, state):
+        return state == self.win
+
+    def name(self, state):
+        """display name of a state, e.g. "bcm-ccmm" """
+        mLeft, cLeft, boatLeft = self.unpack(state)
+        cRight = self.cannibals - cLeft
+        mRight = self.missionaries - mLeft
+        left = "c" * cLeft + "m" * mLeft
+        right = "c" * cRight + "m" * mRight
+        return (
+            ("b" if boatLeft else "") + left + "-" + right + ("" if boatLeft else "b")
+        )
+
+    def parse(self, name):
+        """inverse of name()"""
+        left, right = name.split("-")
+        return self.pack(left.count("m"), left.count("c"), left.startswith("b"))
+
+    def outcome(self, state):
+        """FAILURE, WIN or None for a state that is still in play"""
+        if self.isWin(state):
+            return WIN
+        if self.isFailure(state):
+            return FAILURE
+        return None
+
+    def asDict(self):
+        """
+        string keyed view of the states reachable from start,
+        same layout as the old hand written gameGraph
+        """
+        graph = {}
+        queue = [self.start]
+        seen = {self.start}
+        while queue:
+            state = queue.pop()
+            if self.outcome(state) is not None:
+                graph[self.name(state)] = self.outcome(state)
+                continue
+            edges = {}
+            for move, target in enumerate(self.table[state]):
+                if target < 0:
+                    continue
+                target = int(target)
+                edges[self.moveNames[move]] = self.name(target)
+                if target not in seen:
+                    seen.add(target)
+                    queue.append(target)
+            graph[self.name(state)] = edges
+        return graph
@@ -0,0 +1,109 @@
+"""
+solves every puzzle variant of a parameter grid on a process pool,
+results are appended to a JSONL file as soon as they're ready
+
+    python main.py sweep --missionaries 1 50 --cannibals 1 50 --capacity 1 6
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from solver import Solver
+from stategraph import StateGraph
+
+
+def solveVariant(variant):
+    """solves one (missionaries, cannibals, capacity) variant headlessly"""
+    missionaries, cannibals, capacity = variant
+    start = time.perf_counter()
+    graph = StateGraph(missionaries, cannibals, capacity)
+    solver = Solver(graph)
+    distance = int(solver.distance[graph.start])
+    return {
+        "missionaries": missionaries,
+        "cannibals": cannibals,
+        "capacity": capacity,
+        "solvable": distance >= 0,
+        "crossings": distance if distance >= 0 else None,
+        "states": graph.size,
+        "seconds": round(time.perf_counter() - start, 6),
+    }
+
+
+def completed(path):
+    """
+    variants already in the results file, drops a line
+    left half written by an interrupted run
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+    good = 0
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                break
+            if not line.endswith(b"\n"):
+                break
+            done.add((result["missionaries"], result["cannibals"], result["capacity"]))
+            good += len(line)
+    with open(path, "r+b") as f:
+        f.truncate(good)
+    return done
+
+
+def sweep(path, missionaries, cannibals, capacities, workers=None, resume=True):
+    """solves every variant of the grid not in path yet, returns how many"""
+    done = completed(path) if resume else set()
+    todo = [
+        variant
+        for variant in itertools.product(missionaries, cannibals, capacities)
+        if variant not in done
+    ]
+    # big variants first so they don't end up last on a single worker
+    todo.sort(key=lambda v: (v[0] + 1) * (v[1] + 1) * v[2] ** 2, reverse=True)
+    with open(path, "a" if resume else "w") as f:
+        with multiprocessing.Pool(workers) as pool:
+            for result in pool.imap_unordered(solveVariant, todo):
+                f.write(json.dumps(result) + "\n")
+                f.flush()
+    return len(todo)
+
+
+def inclusive(bounds):
+    return range(bounds[0], bounds[1] + 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="main.py sweep", description="solves a grid of puzzle variants"
+    )
+    parser.add_argument("--missionaries", nargs=2, type=int, default=(1, 20))
+    parser.add_argument("--cannibals", nargs=2, type=int, default=(1, 20))
+    parser.add_argument("--capacity", nargs=2, type=int, default=(1, 6))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="sweep.jsonl")
+    parser.add_argument("--no-resume", action="store_true")
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    count = sweep(
+        args.out,
+        inclusive(args.missionaries),
+        inclusive(args.cannibals),
+        inclusive(args.capacity),
+        args.workers,
+        not args.no_resume,
+    )
+    print(
+        "solved %d variants in %.1f s into %s"
+        % (count, time.perf_counter() - start, args.out)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+telemetry of play: records go into a fixed size ring that a background
+thread drains into rotating gzip compressed JSON lines files, so the
+frame loop never waits for the disk. A full ring drops records and
+counts them, the count gets written as a "dropped" record
+
+    python main.py --telemetry logs
+    python telemetry.py logs
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import os
+import threading
+import time
+import uuid
+
+PATTERN = "telemetry-*.jsonl.gz"
+
+
+class Telemetry:
+    """
+    one session's records, record() is called by the game and never
+    blocks, everything else runs on the writer thread. Only record()
+    moves head and only the writer moves tail, so the ring needs no lock
+    """
+
+    def __init__(
+        self,
+        directory,
+        sessionId=None,
+        capacity=4096,
+        rotateBytes=4 << 20,
+        keep=16,
+        interval=0.5,
+    ):
+        self.directory = directory
+        self.sessionId = sessionId if sessionId != None else uuid.uuid4().hex[:16]
+        self.capacity = capacity
+        self.ring = [None] * capacity
+        self.head = 0
+        self.tail = 0
+        self.dropped = 0
+        self.reported = 0
+        # uncompressed bytes per file and number of files kept in directory
+        self.rotateBytes = rotateBytes
+        self.keep = keep
+        # seconds between drains when the ring isn't filling up
+        self.interval = interval
+        self.file = None
+        self.fileBytes = 0
+        self.part = 0
+        os.makedirs(directory, exist_ok=True)
+        self.wake = threading.Event()
+        self.stopping = False
+        self.thread = threading.Thread(target=self.run, name="telemetry", daemon=True)
+        self.thread.start()
+
+    def record(self, kind, **fields):
+        """queues a record, returns False when it was dropped"""
+        if self.head - self.tail >= self.capacity:
+            self.dropped += 1
+            return False
+        self.ring[self.head % self.capacity] = (time.time(), kind, fields)
+        self.head += 1
+        if self.head - self.tail == self.capacity // 2:
+            self.wake.set()
+        return True
+
+    def run(self):
+        while not self.stopping:
+            self.wake.wait(self.interval)
+            self.wake.clear()
+            self.drain()
+        self.drain()
+        self.closeFile()
+
+    def drain(self):
+        """writes every queued record, tail moves before the disk is touched"""
+        head = self.head
+        lines = []
+        for i in range(self.tail, head):
+            slot = i % self.capacity
+            t, kind, fields = self.ring[slot]
+            self.ring[slot] = None
+            lines.append(self.line(t, kind, fields))
+        self.tail = head
+        dropped = self.dropped
+        if dropped != self.reported:
+            count = {"count": dropped - self.reported, "total": dropped}
+            lines.append(self.line(time.time(), "dropped", count))
+            self.reported = dropped
+        if lines:
+            self.write(("\n".join(lines) + "\n").encode())
+
+    def line(self, t, kind, fields):
+        record = {"t": round(t, 4), "session": self.sessionId, "kind": kind}
+        record.update(fields)
+        return json.dumps(record, separators=(",", ":"))
+
+    def write(self, data):
+        if self.file is None or self.fileBytes >= self.rotateBytes:
+            self.rotate()
+        self.file.write(data)
+        # readers see every drained record, even of a crashed session
+        self.file.flush()
+        self.fileBytes += len(data)
+
+    def rotate(self):
+        """starts the next file, removes the oldest ones over keep"""
+        self.closeFile()
+        self.part += 1
+        name = "telemetry-%d-%s-%04d.jsonl.gz" % (
+            time.time(),
+            self.sessionId,
+            self.part,
+        )
+        self.file = gzip.open(os.path.join(self.directory, name), "wb")
+        self.fileBytes = 0
+        files = sorted(glob.glob(os.path.join(self.directory, PATTERN)))
+        for old in files[: max(len(files) - self.keep, 0)]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+    def closeFile(self):
+        if self.file != None:
+            self.file.close()
+            self.file = None
+
+    def close(self, timeout=2):
+        """writes what's left and stops the writer"""
+        self.stopping = True
+        self.wake.set()
+        self.thread.join(timeout)
+
+
+def read(directory):
+    """records of every file in directory, oldest first"""
+    for path in sorted(glob.glob(os.path.join(directory, PATTERN))):
+        try:
+            with gzip.open(path, "rt") as f:
+                for line in f:
+                    if line.endswith("\n"):
+                        yield json.loads(line)
+        except (EOFError, OSError):
+            # file of a session still writing or one that crashed
+            continue
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("directory")
+    parser.add_argument("--print", action="store_true")
+    args = parser.parse_args()
+    kinds = {}
+    sessions = set()
+    dropped = 0
+    for record in read(args.directory):
+        if args.print:
+            print(json.dumps(record))
+        sessions.add(record["session"])
+        kinds[record["kind"]] = kinds.get(record["kind"], 0) + 1
+        if record["kind"] == "dropped":
+            dropped += record["count"]
+    print("%d sessions, %d records dropped" % (len(sessions), dropped))
+    for kind, count in sorted(kinds.items()):
+        print("%-10s %d" % (kind, count))
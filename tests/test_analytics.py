@@ -0,0 +1,33 @@
+import numpy as np
+from analytics import PlayerModel, analyze, play
+from stategraph import StateGraph
+
+
+def test_players_starting_in_failure_end_at_once():
+    graph = StateGraph(2, 3, 2)
+    steps, states, visits, losses = play(graph, PlayerModel(), 100)
+    assert (steps == 0).all()
+    assert (states == graph.start).all()
+    assert visits.sum() == 0 and losses.sum() == 0
+    report = analyze(graph, PlayerModel(), 100, seed=0)
+    assert report["failure"]["p"] == 1
+    assert report["steps"]["histogram"] == [100]
+    assert report["dangerous"] == []
+
+
+def test_careful_players_never_lose():
+    graph = StateGraph(3, 3, 2)
+    report = analyze(graph, PlayerModel(aversion=0), 2000, seed=0)
+    assert report["failure"]["p"] == 0
+    assert report["win"]["p"] + report["timeout"]["p"] == 1
+    assert report["steps"]["p50"] >= 11
+
+
+def test_outcomes_add_up():
+    graph = StateGraph(3, 3, 2)
+    steps, states, visits, losses = play(
+        graph, PlayerModel(), 5000, rng=np.random.default_rng(0)
+    )
+    done = steps >= 0
+    assert graph.terminal[states[done]].all()
+    assert not graph.terminal[states[~done]].any()
@@ -0,0 +1,102 @@
+import os
+import numpy as np
+import pytest
+import graphcache
+from solver import Solver
+from stategraph import StateGraph
+
+VARIANT = (3, 3, 2)
+
+
+@pytest.fixture
+def cached(tmp_path):
+    """directory and path of a freshly written cache file of VARIANT"""
+    graphcache.load(*VARIANT, tmp_path)
+    target = graphcache.path(*VARIANT, tmp_path)
+    assert os.path.exists(target)
+    return tmp_path, target
+
+
+def rewrite(target, change):
+    with open(target, "rb") as f:
+        data = bytearray(f.read())
+    with open(target, "wb") as f:
+        f.write(change(data))
+
+
+def assertRebuilt(directory, target):
+    assert graphcache.read(*VARIANT, directory) is None
+    assert not os.path.exists(target)
+    graphcache.load(*VARIANT, directory)
+    assert graphcache.read(*VARIANT, directory) is not None
+
+
+def test_read_maps_same_tables_read_only(cached):
+    directory, target = cached
+    graph, solver = graphcache.read(*VARIANT, directory)
+    fresh = StateGraph(*VARIANT)
+    assert np.array_equal(graph.table, fresh.table)
+    assert np.array_equal(graph.terminal, fresh.terminal)
+    assert np.array_equal(solver.distance, Solver(fresh).distance)
+    assert solver.path() == Solver(fresh).path()
+    for array in (graph.table, graph.failure, solver.bestMove):
+        assert not array.flags.writeable
+    with pytest.raises(ValueError):
+        graph.table[0, 0] = 1
+
+
+def test_crc_mismatch_is_rebuilt(cached):
+    directory, target = cached
+
+    def flip(data):
+        data[graphcache.ALIGN] ^= 0xFF
+        return data
+
+    rewrite(target, flip)
+    assertRebuilt(directory, target)
+
+
+def test_wrong_code_hash_is_rebuilt(cached):
+    directory, target = cached
+
+    def otherCode(data):
+        fields = list(graphcache.HEADER.unpack_from(data))
+        fields[5] = bytes(20)
+        graphcache.HEADER.pack_into(data, 0, *fields)
+        return data
+
+    rewrite(target, otherCode)
+    assertRebuilt(directory, target)
+
+
+def test_truncated_file_is_rebuilt(cached):
+    directory, target = cached
+    rewrite(target, lambda data: data[:-10])
+    assertRebuilt(directory, target)
+
+
+def test_empty_file_is_rebuilt(cached):
+    directory, target = cached
+    rewrite(target, lambda data: b"")
+    assertRebuilt(directory, target)
+
+
+def test_files_of_older_code_are_removed(tmp_path):
+    stale = tmp_path / "3-3-2-000000000000.bin"
+    stale.write_bytes(b"old")
+    other = tmp_path / "4-4-3-000000000000.bin"
+    other.write_bytes(b"other variant")
+    graphcache.load(*VARIANT, tmp_path)
+    assert not stale.exists() and other.exists()
+
+
+def test_unchecked_read_skips_crc(cached):
+    directory, target = cached
+
+    def flip(data):
+        data[-1] ^= 0xFF
+        return data
+
+    rewrite(target, flip)
+    assert graphcache.read(*VARIANT, directory, verify=False) is not None
+    assert graphcache.read(*VARIANT, directory) is None
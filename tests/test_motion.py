@@ -0,0 +1,45 @@
+import pygame
+from motion import MotionSystem
+from spatial import SpatialGrid
+
+
+class Sprite:
+    def __init__(self, center):
+        self.rect = pygame.Rect(0, 0, 20, 20)
+        self.rect.center = center
+
+
+def test_moves_end_at_target_and_report_once_per_step():
+    moved, stopped, done = [], [], []
+    motion = MotionSystem(moved.append, stopped.append, capacity=1)
+    a, b = Sprite((0, 0)), Sprite((100, 100))
+    motion.move(a, (100, 0), 1, 0, lambda: done.append("a"))
+    motion.move(b, (100, 300), 2, 0)
+    assert motion.nextDeadline() == 1000
+    motion.step(500)
+    assert a.rect.center == (50, 0) and b.rect.center == (100, 150)
+    assert moved == [[a, b]] and stopped == []
+    motion.step(1000)
+    assert a.rect.center == (100, 0)
+    assert stopped == [[a]] and done == ["a"]
+    assert not motion.moving(a) and motion.nextDeadline() == 2000
+    motion.step(2500)
+    assert b.rect.center == (100, 300) and stopped[-1] == [b]
+    assert len(motion) == 0 and motion.nextDeadline() is None
+
+
+def test_grid_catches_up_with_moved_objects_on_query():
+    grid = SpatialGrid()
+    sprite = Sprite((10, 10))
+    grid.insert(sprite)
+    version = grid.version
+    motion = MotionSystem(grid.moved, grid.refresh)
+    motion.move(sprite, (500, 10), 1, 0)
+    motion.step(500)
+    # marked, not updated until somebody asks
+    assert grid.version == version
+    assert grid.query((255, 10)) == [sprite]
+    assert grid.query((10, 10)) == []
+    motion.step(1000)
+    assert grid.version > version and grid.stale == {}
+    assert grid.query((500, 10)) == [sprite]
@@ -0,0 +1,115 @@
+from scheduler import Scheduler, VirtualClock
+
+
+def make():
+    clock = VirtualClock()
+    return clock, Scheduler(clock)
+
+
+def test_tasks_finish_in_deadline_order():
+    clock, tasks = make()
+    done = []
+    tasks.after(2, lambda: done.append("b"))
+    tasks.after(1, lambda: done.append("a"))
+    tasks.after(2, lambda: done.append("c"))
+    clock.advance(1999)
+    tasks.tick()
+    assert done == ["a"]
+    clock.advance(1)
+    tasks.tick()
+    assert done == ["a", "b", "c"]
+    assert len(tasks) == 0
+    assert tasks.nextDeadline() is None
+
+
+def test_tween_updates_then_finishes_at_one():
+    clock, tasks = make()
+    values = []
+    done = []
+    tasks.tween(1, values.append, lambda: done.append(True))
+    for _ in range(3):
+        clock.advance(250)
+        tasks.tick()
+    clock.advance(1000)
+    tasks.tick()
+    assert values == [0.25, 0.5, 0.75, 1]
+    assert done == [True]
+
+
+def test_cancel_during_tick():
+    clock, tasks = make()
+    done = []
+    later = tasks.after(1, lambda: done.append("later"))
+    tween = tasks.tween(5, lambda t: done.append(t))
+    # first task cancels both others when it fires in the same tick
+    tasks.after(0.5, lambda: (later.cancel(), tween.cancel()))
+    clock.advance(1000)
+    tasks.tick()
+    assert done == [0.2]
+    assert not later.active and later.cancelled
+    assert len(tasks) == 0
+    clock.advance(5000)
+    tasks.tick()
+    assert done == [0.2]
+
+
+def test_add_during_tick_starts_at_deadline():
+    clock, tasks = make()
+    done = []
+
+    def chain():
+        done.append(("first", clock.now))
+        # starts at the deadline of the task that fired, not at clock.now
+        task = tasks.after(1, lambda: done.append(("second", clock.now)))
+        done.append(("start", task.start))
+
+    tasks.after(1, chain)
+    clock.advance(1500)
+    tasks.tick()
+    assert done == [("first", 1500), ("start", 1000)]
+    clock.advance(500)
+    tasks.tick()
+    assert done[-1] == ("second", 2000)
+
+
+def test_task_added_for_now_fires_in_same_tick():
+    clock, tasks = make()
+    done = []
+    tasks.after(1, lambda: tasks.after(0, lambda: done.append("zero")))
+    clock.advance(1000)
+    tasks.tick()
+    assert done == ["zero"]
+
+
+def test_tween_added_during_tick_updates_next_tick():
+    clock, tasks = make()
+    values = []
+    tasks.after(1, lambda: tasks.tween(1, values.append))
+    clock.advance(1000)
+    tasks.tick()
+    assert values == []
+    clock.advance(500)
+    tasks.tick()
+    assert values == [0.5]
+
+
+def test_clear_cancels_everything():
+    clock, tasks = make()
+    done = []
+    for delay in (1, 2, 3):
+        tasks.after(delay, lambda: done.append(delay))
+    tasks.clear()
+    clock.advance(5000)
+    tasks.tick()
+    assert done == []
+    assert len(tasks) == 0
+
+
+def test_task_added_between_ticks_starts_at_last_tick():
+    clock, tasks = make()
+    clock.advance(1000)
+    tasks.tick()
+    # input handled after the tick took a while
+    clock.advance(30)
+    task = tasks.after(1, lambda: None)
+    assert task.start == 1000 and task.deadline == 2000
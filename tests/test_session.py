@@ -0,0 +1,135 @@
+import asyncio
+import pytest
+from scheduler import VirtualClock
+from session import BOARDTIME, CROSSTIME, LEFT, RIGHT, GameSession, SessionHost
+from stategraph import FAILURE, WIN, StateGraph
+
+# people are numbered missionaries first, 0-2 missionaries and 3-5 cannibals
+M0, C0, C1 = 0, 3, 4
+CLASSIC = ["2c", "c", "2c", "c", "2m", "cm", "2m", "c", "2c", "m", "cm"]
+
+
+def ms(seconds):
+    return seconds * 1000
+
+
+def test_click_boards_and_person_is_busy_until_seated():
+    session = GameSession(StateGraph())
+    assert session.click(C0)
+    assert session.slots == [C0, None]
+    # still walking to the raft
+    assert not session.click(C0)
+    assert not session.depart()
+    session.tick(ms(BOARDTIME))
+    assert not session.busy[C0]
+    assert session.click(C0)
+    session.tick(ms(BOARDTIME))
+    assert session.slots == [None, None]
+
+
+def test_raft_holds_capacity_people_of_its_bank():
+    session = GameSession(StateGraph())
+    assert session.click(C0) and session.click(C1)
+    assert not session.click(M0)
+    session.tick(ms(BOARDTIME))
+    assert session.depart()
+    # nobody gets on or off while crossing, the raft can't leave twice
+    assert not session.click(C0)
+    assert not session.depart()
+    session.tick(ms(CROSSTIME))
+    assert session.raftSide == LEFT
+    assert session.sides[C0] == session.sides[C1] == LEFT
+    assert session.graph.name(session.state) == "bcc-cmmm"
+    # people on the other bank can't board
+    assert not session.click(M0)
+
+
+def test_empty_raft_does_not_launch():
+    session = GameSession(StateGraph())
+    assert not session.launch()
+    assert not session.depart()
+    assert not session.crossing
+
+
+def test_arrive_returns_move_and_sets_outcome():
+    graph = StateGraph()
+    session = GameSession(graph)
+    session.toggle(M0)
+    session.boarded((M0,))
+    assert session.launch()
+    assert session.arrive() == graph.moveId["m"]
+    assert session.outcome == FAILURE
+    assert not session.idle()
+    assert not session.click(C0)
+
+
+def test_play_wins_classic_puzzle():
+    session = GameSession(StateGraph())
+    for move in CLASSIC:
+        session.play(move)
+        session.tick(ms(BOARDTIME + CROSSTIME))
+    assert session.outcome == WIN
+    assert session.crossings == 11
+
+
+def test_play_rejects_moves_it_cant_make():
+    session = GameSession(StateGraph())
+    with pytest.raises(ValueError, match="3c"):
+        session.play("3c")
+    session.play("2c")
+    with pytest.raises(ValueError, match="still moving"):
+        session.play("c")
+    session.tick(ms(BOARDTIME))
+    assert session.crossing
+    with pytest.raises(ValueError, match="not possible now"):
+        session.play("c")
+    session.tick(ms(CROSSTIME))
+    with pytest.raises(ValueError, match="not possible in bcc-cmmm"):
+        session.play("m")
+
+
+def test_reset_drops_pending_timers():
+    session = GameSession(StateGraph())
+    session.play("2c")
+    generation = session.generation
+    session.reset()
+    assert session.generation == generation + 1
+    session.tick(ms(BOARDTIME + CROSSTIME))
+    assert session.state == session.graph.start
+    assert session.crossings == 0 and not session.crossing
+    assert session.sides == bytearray([RIGHT]) * 6
+
+
+def test_host_runs_sessions_on_one_scheduler():
+    graph = StateGraph()
+    host = SessionHost(graph, VirtualClock())
+    first, second = host.create(), host.create()
+    host.play(first.sessionId, "2c")
+    host.play(second.sessionId, "2c")
+    host.close(second.sessionId)
+    assert len(host) == 1
+    host.runVirtual()
+    assert graph.name(first.state) == "bcc-cmmm"
+    # timers of the closed session were dropped, its raft never left
+    assert second.crossings == 0 and second.state == graph.start
+
+
+def test_host_run_sleeps_until_next_timer():
+    graph = StateGraph()
+    now = [0]
+    host = SessionHost(graph, lambda: now[0])
+
+    async def scenario():
+        runner = asyncio.ensure_future(host.run())
+        session = host.create()
+        host.play(session.sessionId, "2c")
+        await asyncio.sleep(0.01)
+        now[0] = ms(BOARDTIME + CROSSTIME)
+        # a click wakes the host up to run what is due, even a rejected one
+        assert not host.click(session.sessionId, C1)
+        await asyncio.sleep(0.01)
+        runner.cancel()
+        return session
+
+    session = asyncio.run(scenario())
+    assert graph.name(session.state) == "bcc-cmmm"
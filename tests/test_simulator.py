@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from simulator import NONE, encodeMoves, simulate
+from stategraph import StateGraph
+
+CLASSIC = ["2c", "c", "2c", "c", "2m", "cm", "2m", "c", "2c", "m", "cm"]
+
+
+def test_classic_path_wins_at_last_step():
+    result = simulate([CLASSIC])
+    assert result.winStep.tolist() == [10]
+    assert result.failureStep.tolist() == [NONE]
+    assert result.invalidStep.tolist() == [NONE]
+    assert result.finalStates.tolist() == [StateGraph().win]
+
+
+def test_impossible_move_is_invalid_at_its_step():
+    # nobody is left on the bank the boat reached to bring a missionary
+    result = simulate([["c", "m"]])
+    assert result.invalidStep.tolist() == [1]
+    assert not result.won[0] and not result.failed[0]
+    assert StateGraph().name(result.finalStates[0]) == "bc-ccmmm"
+
+
+def test_padded_sequences_stop_on_their_own():
+    graph = StateGraph()
+    result = simulate([CLASSIC, ["2c"], ["m", "c"], []], graph)
+    assert result.winStep.tolist() == [10, NONE, NONE, NONE]
+    # moves after a failure are ignored, not reported as invalid
+    assert result.failureStep.tolist() == [NONE, NONE, 0, NONE]
+    assert result.invalidStep.tolist() == [NONE] * 4
+    names = [graph.name(s) for s in result.finalStates]
+    assert names == ["bcccmmm-", "bcc-cmmm", "bm-cccmm", "-cccmmmb"]
+
+
+def test_encoded_moves_are_padded():
+    graph = StateGraph()
+    moves = encodeMoves([["2c", "c"], ["m"]], graph)
+    assert moves.tolist() == [
+        [graph.moveId["2c"], graph.moveId["c"]],
+        [graph.moveId["m"], NONE],
+    ]
+    result = simulate(moves, graph)
+    assert np.array_equal(result.failed, [False, True])
+
+
+def test_unknown_move_raises():
+    with pytest.raises(ValueError, match="3c"):
+        simulate([["2c"], ["3c"]])
@@ -0,0 +1,38 @@
+from solver import Solver
+from stategraph import StateGraph
+
+
+def test_path_of_classic_puzzle():
+    graph = StateGraph(3, 3, 2)
+    solver = Solver(graph)
+    path = solver.path()
+    assert path == ["2c", "c", "2c", "c", "2m", "cm", "2m", "c", "2c", "m", "cm"]
+    assert solver.distance[graph.start] == 11
+    state = graph.start
+    for move in path:
+        state = graph.step(state, move)
+        assert not graph.isFailure(state)
+    assert graph.isWin(state)
+
+
+def test_distances_drop_by_one_along_best_moves():
+    graph = StateGraph(3, 3, 2)
+    solver = Solver(graph)
+    for state in range(graph.size):
+        if solver.distance[state] > 0:
+            target = graph.step(state, int(solver.bestMove[state]))
+            assert solver.distance[target] == solver.distance[state] - 1
+
+
+def test_unsolvable_variant():
+    solver = Solver(StateGraph(4, 4, 2))
+    assert not solver.solvable()
+    assert solver.path() is None
+    assert solver.hint(solver.graph.start) is None
+
+
+def test_no_hint_at_win():
+    graph = StateGraph(3, 3, 2)
+    solver = Solver(graph)
+    assert solver.hint(graph.win) is None
+    assert solver.path(graph.win) == []
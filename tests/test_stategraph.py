@@ -0,0 +1,157 @@
+import pytest
+from stategraph import FAILURE, WIN, StateGraph, validate
+
+# gameGraph as it was written by hand before it was generated, its
+# "bccmmm-c" "m" edge led to the misspelled state "ccbb-cmb"
+HANDWRITTEN = {
+    "-cccmmmb": {
+        "c": "bc-ccmmm",
+        "m": "bm-cccmm",
+        "2c": "bcc-cmmm",
+        "2m": "bmm-cccm",
+        "cm": "bcm-ccmm",
+    },
+    "m-cccmmb": FAILURE,
+    "mm-cccmb": FAILURE,
+    "mmm-cccb": {"c": "bcmmm-cc", "2c": "bccmmm-c"},
+    "c-ccmmmb": {
+        "c": "bcc-cmmm",
+        "2c": "bccc-mmm",
+        "m": "bcm-ccmm",
+        "2m": "bcmm-ccm",
+        "cm": "bccm-cmm",
+    },
+    "cc-cmmmb": {"c": "bccc-mmm", "m": "bccm-cmm", "2m": "bccmm-cm", "cm": "bcccm-mm"},
+    "ccc-mmmb": {"m": "bcccm-mm", "2m": "bcccmm-m"},
+    "cm-ccmmb": {
+        "c": "bccm-cmm",
+        "m": "bcmm-ccm",
+        "2c": "bcccm-mm",
+        "2m": "bcmmm-cc",
+        "cm": "bccmm-cm",
+    },
+    "ccm-cmmb": FAILURE,
+    "cccm-mmb": FAILURE,
+    "cmm-ccmb": FAILURE,
+    "ccmm-cmb": {"c": "bcccmm-m", "m": "bccmmm-c", "cm": "bcccmmm-"},
+    "cccmm-mb": FAILURE,
+    "cmmm-ccb": {"c": "bccmmm-c", "2c": "bcccmmm-"},
+    "ccmmm-cb": {"c": "bcccmmm-"},
+    "bm-cccmm": FAILURE,
+    "bmm-cccm": FAILURE,
+    "bmmm-ccc": {"m": "mm-cccmb", "2m": "m-cccmmb"},
+    "bc-ccmmm": {"c": "-cccmmmb"},
+    "bcc-cmmm": {"c": "c-ccmmmb", "2c": "-cccmmmb"},
+    "bccc-mmm": {"c": "cc-cmmmb", "2c": "c-ccmmmb"},
+    "bcm-ccmm": {"c": "m-cccmmb", "m": "c-ccmmmb", "cm": "-cccmmmb"},
+    "bccm-cmm": FAILURE,
+    "bcccm-mm": FAILURE,
+    "bcmm-ccm": FAILURE,
+    "bccmm-cm": {
+        "c": "cmm-ccmb",
+        "m": "ccm-cmmb",
+        "2c": "mm-cccmb",
+        "2m": "cc-cmmmb",
+        "cm": "cm-ccmmb",
+    },
+    "bcccmm-m": FAILURE,
+    "bcmmm-cc": {"c": "mmm-cccb", "m": "cmm-ccmb", "2m": "cm-ccmmb", "cm": "mm-cccmb"},
+    "bccmmm-c": {
+        "c": "cmmm-ccb",
+        "m": "ccbb-cmb",
+        "2c": "mmm-cccb",
+        "2m": "ccm-cmmb",
+        "cm": "cmm-ccmb",
+    },
+    "bcccmmm-": WIN,
+}
+
+
+def test_generated_graph_matches_handwritten():
+    generated = StateGraph(3, 3, 2).asDict()
+    assert set(generated) <= set(HANDWRITTEN)
+    for name, edges in generated.items():
+        expected = HANDWRITTEN[name]
+        if isinstance(expected, dict):
+            typos = [m for m, t in expected.items() if t == "ccbb-cmb"]
+            expected = {m: t for m, t in expected.items() if m not in typos}
+            edges = {m: t for m, t in edges.items() if m not in typos}
+        assert edges == expected, name
+
+
+def test_generated_graph_fixes_typo():
+    assert StateGraph(3, 3, 2).asDict()["bccmmm-c"]["m"] == "ccmm-cmb"
+
+
+def test_steps_match_names():
+    graph = StateGraph(3, 3, 2)
+    for name, edges in graph.asDict().items():
+        state = graph.parse(name)
+        assert graph.name(state) == name
+        if isinstance(edges, str):
+            assert graph.outcome(state) == edges
+            continue
+        for move, target in edges.items():
+            assert graph.name(graph.step(state, move)) == target
+
+
+def test_validator_finds_handwritten_typo():
+    problems = validate(HANDWRITTEN)
+    assert problems == ["bccmmm-c m -> 'ccbb-cmb' isn't a state"]
+    with pytest.raises(ValueError, match="ccbb-cmb"):
+        StateGraph.fromDict(HANDWRITTEN)
+
+
+def test_fixed_handwritten_graph_compiles():
+    fixed = dict(HANDWRITTEN)
+    fixed["bccmmm-c"] = dict(fixed["bccmmm-c"], m="ccmm-cmb")
+    compiled = StateGraph.fromDict(fixed)
+    generated = StateGraph(3, 3, 2)
+    listed = [generated.parse(name) for name in fixed]
+    assert (compiled.table[listed] == generated.table[listed]).all()
+    unlisted = sorted(set(range(generated.size)) - set(listed))
+    assert (compiled.table[unlisted] == -1).all()
+    assert compiled.asDict() == generated.asDict()
+
+
+@pytest.mark.parametrize("variant", [(3, 3, 2), (1, 1, 1), (5, 5, 3), (4, 2, 2)])
+def test_generated_graphs_round_trip(variant):
+    graph = StateGraph(*variant)
+    assert validate(graph.asDict()) == []
+    compiled = StateGraph.fromDict(graph.asDict())
+    assert compiled.asDict() == graph.asDict()
+
+
+def test_only_listed_edges_are_compiled():
+    graph = StateGraph(3, 3, 2).asDict()
+    del graph["-cccmmmb"]["2c"]
+    compiled = StateGraph.fromDict(graph)
+    with pytest.raises(ValueError, match="not possible"):
+        compiled.step(compiled.start, "2c")
+    assert compiled.name(compiled.step(compiled.start, "c")) == "bc-ccmmm"
+    small = {"-cccmmmb": {"c": "bc-ccmmm"}, "bc-ccmmm": {}}
+    compiled = StateGraph.fromDict(small)
+    assert compiled.asDict() == small
+    assert (compiled.table >= 0).sum() == 1
+
+
+def test_missing_start_is_reported():
+    with pytest.raises(ValueError, match="start state -cccmmmb is missing"):
+        StateGraph.fromDict({"bc-ccmmm": {}}, capacity=2)
+
+
+def test_wrong_edge_is_reported():
+    graph = StateGraph(3, 3, 2).asDict()
+    graph["-cccmmmb"]["c"] = "bcc-cmmm"
+    with pytest.raises(ValueError, match="-cccmmmb c leads to bc-ccmmm, not bcc-cmmm"):
+        StateGraph.fromDict(graph)
+
+
+def test_graphs_without_moves():
+    with pytest.raises(ValueError, match="no states"):
+        StateGraph.fromDict({})
+    lost = StateGraph(2, 3, 2).asDict()
+    assert lost == {"-cccmmb": FAILURE}
+    with pytest.raises(ValueError, match="capacity has to be given"):
+        StateGraph.fromDict(lost)
+    assert StateGraph.fromDict(lost, capacity=2).asDict() == lost
@@ -0,0 +1,69 @@
+import glob
+import os
+import telemetry
+from telemetry import PATTERN, Telemetry
+
+
+class Paused(Telemetry):
+    """telemetry whose writer thread exits at once, drain() is called by hand"""
+
+    def run(self):
+        pass
+
+
+def kinds(directory):
+    return [record["kind"] for record in telemetry.read(directory)]
+
+
+def test_full_ring_drops_and_counts(tmp_path):
+    log = Paused(tmp_path, capacity=4)
+    assert [log.record("click", n=i) for i in range(6)] == [True] * 4 + [False] * 2
+    assert log.dropped == 2
+    log.drain()
+    assert [log.record("click") for i in range(5)] == [True] * 4 + [False]
+    log.drain()
+    log.closeFile()
+    records = list(telemetry.read(tmp_path))
+    assert [r.get("n") for r in records[:4]] == [0, 1, 2, 3]
+    dropped = [r for r in records if r["kind"] == "dropped"]
+    assert [(r["count"], r["total"]) for r in dropped] == [(2, 2), (1, 3)]
+    assert {r["session"] for r in records} == {log.sessionId}
+
+
+def test_nothing_dropped_writes_no_dropped_record(tmp_path):
+    log = Paused(tmp_path)
+    log.record("state")
+    log.drain()
+    log.drain()
+    log.closeFile()
+    assert kinds(tmp_path) == ["state"]
+
+
+def test_rotation_keeps_newest_files(tmp_path):
+    log = Paused(tmp_path, rotateBytes=1, keep=2)
+    for i in range(4):
+        log.record("click", n=i)
+        log.drain()
+    log.closeFile()
+    assert len(glob.glob(os.path.join(tmp_path, PATTERN))) == 2
+    assert [r["n"] for r in telemetry.read(tmp_path)] == [2, 3]
+
+
+def test_read_takes_lines_of_files_still_written(tmp_path):
+    log = Paused(tmp_path)
+    for i in range(3):
+        log.record("click", n=i)
+    log.drain()
+    # flushed but not closed, the gzip stream has no end yet
+    (tmp_path / "telemetry-0-broken-0001.jsonl.gz").write_bytes(b"not gzip")
+    assert kinds(tmp_path) == ["click"] * 3
+    log.closeFile()
+
+
+def test_writer_thread_drains_on_close(tmp_path):
+    log = Telemetry(tmp_path, interval=60)
+    for i in range(10):
+        log.record("click", n=i)
+    log.close()
+    assert not log.thread.is_alive()
+    assert [r["n"] for r in telemetry.read(tmp_path)] == list(range(10))